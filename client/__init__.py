@@ -5,9 +5,11 @@
 
 # 导出主要类，方便用户直接从包中导入
 from .plugin import McpPlugin
+from .async_plugin import AsyncMcpPlugin
 from .cli import main as cli_main
 
 __all__ = [
     "McpPlugin",
+    "AsyncMcpPlugin",
     "cli_main"
 ]
\ No newline at end of file
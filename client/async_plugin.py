@@ -0,0 +1,260 @@
+"""
+异步AI插件接口模块
+提供基于asyncio的插件接口，多个请求可在同一事件循环中并发执行
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+# aiohttp为可选依赖，仅异步插件需要
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .plugin import (McpPlugin, orjson, _ENDPOINTS, _JSON_HEADERS, _encode_json, _search_payload,
+                     _ResponseCache, _PROJECTS_TTL)
+
+logger = logging.getLogger(__name__)
+
+class AsyncMcpPlugin:
+    """
+    异步MCP插件类
+
+    与McpPlugin接口一致，所有请求方法均为协程，共用一个aiohttp会话的连接池
+    """
+
+    def __init__(self, server_url: str = "http://127.0.0.1:5000"):
+        """
+        初始化异步MCP插件
+
+        Args:
+            server_url: MCP服务器URL
+
+        Returns:
+            无返回值
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncMcpPlugin需要aiohttp，请先安装: pip install aiohttp")
+
+        self.server_url = server_url.rstrip('/')
+        self._urls = {name: self.server_url + path for name, path in _ENDPOINTS.items()}
+        self._session: Optional["aiohttp.ClientSession"] = None  # 首次请求时在事件循环中创建
+        self._response_cache = _ResponseCache()
+        logger.info(f"异步MCP插件初始化完成，服务器URL: {server_url}")
+
+    async def _ensure_session(self) -> "aiohttp.ClientSession":
+        """
+        获取会话，不存在时创建
+
+        Returns:
+            aiohttp会话
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=85)
+            )
+        return self._session
+
+    async def _request(self, method: str, url: str, action: str,
+                       data: Optional[Dict[str, Any]] = None, ttl: float = 0) -> Dict[str, Any]:
+        """
+        发送请求并解析JSON响应
+
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            action: 操作名称，用于错误信息
+            data: 请求体
+            ttl: GET响应的缓存时间（秒），为0时不缓存
+
+        Returns:
+            响应字典，失败时返回错误信息字典
+        """
+        if ttl > 0:
+            cached = self._response_cache.get(url)
+            if cached is not None:
+                return cached
+        elif method == "DELETE" or url == self._urls["index"]:
+            # 索引和删除会改变项目列表，清空缓存
+            self._response_cache.clear()
+
+        try:
+            session = await self._ensure_session()
+            body = None if data is None else _encode_json(data)
+            headers = None if data is None else _JSON_HEADERS
+            async with session.request(method, url, data=body, headers=headers) as response:
+                response.raise_for_status()
+                if orjson is not None:
+                    result = orjson.loads(await response.read())
+                else:
+                    result = await response.json()
+            if ttl > 0:
+                self._response_cache.put(url, result, ttl)
+            return result
+        except Exception as e:
+            logger.error(f"{action}失败: {str(e)}")
+            return {
+                "error": True,
+                "message": f"{action}失败: {str(e)}"
+            }
+
+    async def close(self) -> None:
+        """
+        关闭会话，释放连接池中的连接
+
+        Returns:
+            无返回值
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncMcpPlugin":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def identify_project(self, project_path: str) -> Dict[str, Any]:
+        """
+        识别项目
+
+        Args:
+            project_path: 项目路径
+
+        Returns:
+            项目识别结果字典
+        """
+        data = {"project_path": os.path.abspath(project_path)}
+        return await self._request("POST", self._urls["identify"], "项目识别", data)
+
+    async def index_project(self, project_path: str,
+                            wait_complete: bool = False,
+                            timeout: int = 300) -> Dict[str, Any]:
+        """
+        索引项目
+
+        Args:
+            project_path: 项目路径
+            wait_complete: 是否等待索引完成
+            timeout: 等待超时时间（秒）
+
+        Returns:
+            索引结果字典
+        """
+        data = {"project_path": os.path.abspath(project_path)}
+        result = await self._request("POST", self._urls["index"], "索引项目", data)
+
+        # 如果不等待完成或启动失败，直接返回
+        project_id = result.get("project_id")
+        if not wait_complete or "error" in result or not project_id:
+            return result
+
+        return await self._wait_indexing_complete(project_id, timeout)
+
+    async def _wait_indexing_complete(self, project_id: str, timeout: int) -> Dict[str, Any]:
+        """
+        等待索引完成，等待期间不阻塞事件循环
+
+        Args:
+            project_id: 项目ID
+            timeout: 超时时间（秒）
+
+        Returns:
+            索引状态字典
+        """
+        url = self._urls["status"] + project_id
+        start_time = time.time()
+
+        while time.time() - start_time < timeout:
+            result = await self._request("GET", url, "检查索引状态")
+            if "error" in result:
+                return result
+
+            # 如果索引完成或失败，返回结果
+            status = result.get("indexing_status", {}).get("status")
+            if status in ["completed", "failed"]:
+                return result
+
+            # 等待一段时间再检查
+            await asyncio.sleep(2)
+
+        # 超时
+        return {
+            "error": True,
+            "message": f"索引超时: {timeout}秒"
+        }
+
+    async def search(self, query: str, project_ids: Optional[List[str]] = None,
+                     filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> Dict[str, Any]:
+        """
+        搜索代码
+
+        Args:
+            query: 查询字符串
+            project_ids: 项目ID列表，如果为None则搜索所有项目
+            filters: 过滤条件，如语言、文件类型等
+            limit: 返回结果数量限制
+
+        Returns:
+            搜索结果字典
+        """
+        data = _search_payload(query, project_ids, filters, limit)
+        return await self._request("POST", self._urls["search"], "搜索代码", data)
+
+    async def get_code_context(self, file_path: str, line_number: int,
+                               context_lines: int = 10) -> Dict[str, Any]:
+        """
+        获取代码上下文
+
+        Args:
+            file_path: 文件路径
+            line_number: 行号
+            context_lines: 上下文行数
+
+        Returns:
+            代码上下文字典
+        """
+        data = {
+            "file_path": os.path.abspath(file_path),
+            "line_number": line_number,
+            "context_lines": context_lines
+        }
+        return await self._request("POST", self._urls["context"], "获取代码上下文", data)
+
+    async def get_projects(self) -> Dict[str, Any]:
+        """
+        获取项目列表
+
+        Returns:
+            项目列表字典
+        """
+        return await self._request("GET", self._urls["projects"], "获取项目列表", ttl=_PROJECTS_TTL)
+
+    async def delete_project(self, project_id: str) -> Dict[str, Any]:
+        """
+        删除项目索引
+
+        Args:
+            project_id: 项目ID
+
+        Returns:
+            删除结果字典
+        """
+        return await self._request("DELETE", self._urls["project"] + project_id, "删除项目索引")
+
+    async def health_check(self) -> bool:
+        """
+        检查服务器健康状态
+
+        Returns:
+            如果服务器正常则返回True，否则返回False
+        """
+        return "error" not in await self._request("GET", self._urls["health"], "健康检查")
+
+    # 结果格式化不涉及I/O，与同步插件共用
+    format_for_ai = McpPlugin.format_for_ai
@@ -218,9 +218,6 @@ def main():
         parser.print_help()
         return
     
-    # 创建MCP插件
-    plugin = McpPlugin(args.server)
-    
     # 处理命令
     command_handlers = {
         'identify': handle_identify,
@@ -232,15 +229,18 @@ def main():
         'health': handle_health
     }
     
-    if args.command in command_handlers:
+    if args.command not in command_handlers:
+        parser.print_help()
+        return
+    
+    # 创建MCP插件，命令结束后释放连接
+    with McpPlugin(args.server) as plugin:
         try:
             command_handlers[args.command](plugin, args)
         except Exception as e:
             logger.error(f"命令执行失败: {str(e)}")
             print(f"错误: {str(e)}")
             sys.exit(1)
-    else:
-        parser.print_help()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
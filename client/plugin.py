@@ -8,11 +8,124 @@ import sys
 import json
 import logging
 import requests
-from typing import Dict, Any, List, Optional, Tuple, Callable
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import Future
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterator
 import time
 
+# orjson为可选依赖，可用时用于解析响应
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 固定的接口路径，插件初始化时与服务器URL拼接一次
+_ENDPOINTS = {
+    "identify": "/api/project/identify",
+    "index": "/api/project/index",
+    "status": "/api/project/status/",
+    "search": "/api/search",
+    "search_batch": "/api/search/batch",
+    "context": "/api/context",
+    "projects": "/api/projects",
+    "project": "/api/project/",
+    "health": "/health",
+}
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 项目列表很少变化，短时间内的重复查询直接使用缓存
+_PROJECTS_TTL = 1.0
+
+class _ResponseCache:
+    """幂等GET请求的短期响应缓存，按URL缓存并在有效期后失效"""
+
+    def __init__(self, max_size: int = 256):
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """获取未过期的响应，不存在或已过期时返回None"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            self._entries.move_to_end(url)
+            return entry[1]
+
+    def put(self, url: str, value: Dict[str, Any], ttl: float) -> None:
+        """缓存响应，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[url] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(url)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存，在修改服务器状态的请求后调用"""
+        with self._lock:
+            self._entries.clear()
+
+def _encode_json(data: Any) -> bytes:
+    """
+    将请求体序列化为JSON字节，orjson可用时直接在C层完成编码
+
+    Args:
+        data: 请求数据
+
+    Returns:
+        JSON字节串
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+def _search_payload(query: str, project_ids: Optional[List[str]],
+                    filters: Optional[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """
+    构建搜索请求体
+
+    Args:
+        query: 查询字符串
+        project_ids: 项目ID列表，如果为None则搜索所有项目
+        filters: 过滤条件
+        limit: 返回结果数量限制
+
+    Returns:
+        请求数据字典
+    """
+    data = {
+        "query": query,
+        "limit": limit
+    }
+
+    if project_ids:
+        data["project_ids"] = project_ids
+
+    if filters:
+        data["filters"] = filters
+
+    return data
+
+def _parse_json(response: requests.Response) -> Any:
+    """
+    解析响应体JSON，orjson可用时直接从字节解析，省去文本解码
+
+    Args:
+        response: HTTP响应
+
+    Returns:
+        解析后的对象
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
 class McpPlugin:
     """
     MCP插件类
@@ -31,32 +144,102 @@ class McpPlugin:
             无返回值
         """
         self.server_url = server_url.rstrip('/')
+        self._urls = {name: self.server_url + path for name, path in _ENDPOINTS.items()}
+        
+        # 复用同一会话的连接池，避免每次请求重新建立TCP/TLS连接
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # 合并短时间内提交的搜索请求，由后台线程批量发送
+        self._batch_queue: deque = deque()
+        self._batch_event = threading.Event()
+        self._batch_thread: Optional[threading.Thread] = None
+        self._batch_lock = threading.Lock()
+        self._response_cache = _ResponseCache()
+        
+        # 关闭时置位，唤醒所有等待中的轮询与发送线程
+        self._closed = threading.Event()
+        
         logger.info(f"MCP插件初始化完成，服务器URL: {server_url}")
     
-    def identify_project(self, project_path: str) -> Dict[str, Any]:
+    def close(self) -> None:
         """
-        识别项目
+        关闭会话，释放连接池中的连接
+        
+        Returns:
+            无返回值
+        """
+        # 在_batch_lock内设置关闭标志，与submit_search的检查互斥，
+        # 保证关闭前入队的请求都会被发送线程处理
+        with self._batch_lock:
+            self._closed.set()
+        self._batch_event.set()
+        if self._batch_thread is not None:
+            self._batch_thread.join()
+        self._session.close()
+    
+    def _request(self, method: str, url: str, action: str,
+                 data: Optional[Dict[str, Any]] = None, ttl: float = 0) -> Dict[str, Any]:
+        """
+        发送请求并解析JSON响应，所有接口方法共用
         
         Args:
-            project_path: 项目路径
+            method: HTTP方法
+            url: 请求URL
+            action: 操作名称，用于错误信息
+            data: 请求体，以预先序列化的JSON发送
+            ttl: GET响应的缓存时间（秒），为0时不缓存
             
         Returns:
-            项目识别结果字典
+            响应字典，失败时返回错误信息字典
         """
-        url = f"{self.server_url}/api/project/identify"
-        data = {"project_path": os.path.abspath(project_path)}
+        if ttl > 0:
+            cached = self._response_cache.get(url)
+            if cached is not None:
+                return cached
+        elif method == "DELETE" or url == self._urls["index"]:
+            # 索引和删除会改变项目列表，清空缓存
+            self._response_cache.clear()
         
         try:
-            response = requests.post(url, json=data)
+            if data is None:
+                response = self._session.request(method, url)
+            else:
+                response = self._session.request(method, url, data=_encode_json(data),
+                                                 headers=_JSON_HEADERS)
             response.raise_for_status()
-            return response.json()
+            result = _parse_json(response)
+            if ttl > 0:
+                self._response_cache.put(url, result, ttl)
+            return result
         except Exception as e:
-            logger.error(f"项目识别失败: {str(e)}")
+            logger.error(f"{action}失败: {str(e)}")
             return {
                 "error": True,
-                "message": f"项目识别失败: {str(e)}"
+                "message": f"{action}失败: {str(e)}"
             }
     
+    def __enter__(self) -> "McpPlugin":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def identify_project(self, project_path: str) -> Dict[str, Any]:
+        """
+        识别项目
+        
+        Args:
+            project_path: 项目路径
+            
+        Returns:
+            项目识别结果字典
+        """
+        data = {"project_path": os.path.abspath(project_path)}
+        return self._request("POST", self._urls["identify"], "项目识别", data)
+    
     def index_project(self, project_path: str, 
                      wait_complete: bool = False, 
                      timeout: int = 300) -> Dict[str, Any]:
@@ -71,31 +254,16 @@ class McpPlugin:
         Returns:
             索引结果字典
         """
-        url = f"{self.server_url}/api/project/index"
         data = {"project_path": os.path.abspath(project_path)}
+        result = self._request("POST", self._urls["index"], "索引项目", data)
         
-        try:
-            # 启动索引
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            result = response.json()
-            
-            # 如果不等待完成，直接返回
-            if not wait_complete:
-                return result
-            
-            # 等待索引完成
-            project_id = result.get("project_id")
-            if not project_id:
-                return result
-            
-            return self._wait_indexing_complete(project_id, timeout)
-        except Exception as e:
-            logger.error(f"索引项目失败: {str(e)}")
-            return {
-                "error": True,
-                "message": f"索引项目失败: {str(e)}"
-            }
+        # 如果不等待完成或启动失败，直接返回
+        project_id = result.get("project_id")
+        if not wait_complete or "error" in result or not project_id:
+            return result
+        
+        # 等待索引完成
+        return self._wait_indexing_complete(project_id, timeout)
     
     def _wait_indexing_complete(self, project_id: str, timeout: int) -> Dict[str, Any]:
         """
@@ -108,29 +276,29 @@ class McpPlugin:
         Returns:
             索引状态字典
         """
-        url = f"{self.server_url}/api/project/status/{project_id}"
+        url = self._urls["status"] + project_id
         start_time = time.time()
+        interval = 0.1
         
         while time.time() - start_time < timeout:
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                result = response.json()
-                
-                status = result.get("indexing_status", {}).get("status")
-                
-                # 如果索引完成或失败，返回结果
-                if status in ["completed", "failed"]:
-                    return result
-                
-                # 等待一段时间再检查
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"检查索引状态失败: {str(e)}")
+            result = self._request("GET", url, "检查索引状态")
+            if "error" in result:
+                return result
+            
+            status = result.get("indexing_status", {}).get("status")
+            
+            # 如果索引完成或失败，返回结果
+            if status in ["completed", "failed"]:
+                return result
+            
+            # 等待一段时间再检查，间隔从0.1秒逐步增加到2秒，小项目可更快返回
+            # 插件关闭时立即结束等待
+            if self._closed.wait(interval):
                 return {
                     "error": True,
-                    "message": f"检查索引状态失败: {str(e)}"
+                    "message": "插件已关闭，停止等待索引"
                 }
+            interval = min(interval * 2, 2.0)
         
         # 超时
         return {
@@ -152,29 +320,118 @@ class McpPlugin:
         Returns:
             搜索结果字典
         """
-        url = f"{self.server_url}/api/search"
-        data = {
-            "query": query,
-            "limit": limit
-        }
-        
-        if project_ids:
-            data["project_ids"] = project_ids
+        data = _search_payload(query, project_ids, filters, limit)
+        return self._request("POST", self._urls["search"], "搜索代码", data)
+    
+    def iter_search(self, query: str, project_ids: Optional[List[str]] = None,
+                    filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> Iterator[Dict[str, Any]]:
+        """
+        流式搜索代码，服务器每返回一个代码块立即产出，不等待完整响应
         
-        if filters:
-            data["filters"] = filters
+        Args:
+            query: 查询字符串
+            project_ids: 项目ID列表，如果为None则搜索所有项目
+            filters: 过滤条件，如语言、文件类型等
+            limit: 返回结果数量限制
+            
+        Returns:
+            代码块字典迭代器，请求失败时产出一个错误信息字典
+        """
+        data = _search_payload(query, project_ids, filters, limit)
+        loads = orjson.loads if orjson is not None else json.loads
         
         try:
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            return response.json()
+            with self._session.post(self._urls["search"], params={"stream": "true"},
+                                    data=_encode_json(data), headers=_JSON_HEADERS,
+                                    stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(chunk_size=65536):
+                    if line:
+                        yield loads(line)
         except Exception as e:
-            logger.error(f"搜索代码失败: {str(e)}")
-            return {
+            logger.error(f"流式搜索代码失败: {str(e)}")
+            yield {
                 "error": True,
-                "message": f"搜索代码失败: {str(e)}"
+                "message": f"流式搜索代码失败: {str(e)}"
             }
     
+    def search_batch(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量搜索代码，所有查询在一次请求中发送
+        
+        Args:
+            queries: 查询列表，每项包含query及可选的project_ids、filters、limit
+            
+        Returns:
+            与queries顺序一致的搜索结果列表
+        """
+        result = self._request("POST", self._urls["search_batch"], "批量搜索代码", {"queries": queries})
+        if "error" in result:
+            return [dict(result) for _ in queries]
+        return result.get("results", [])
+    
+    def submit_search(self, query: str, project_ids: Optional[List[str]] = None,
+                      filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> Future:
+        """
+        提交搜索请求，短时间窗口内提交的请求合并为一次批量请求发送
+        
+        Args:
+            query: 查询字符串
+            project_ids: 项目ID列表，如果为None则搜索所有项目
+            filters: 过滤条件，如语言、文件类型等
+            limit: 返回结果数量限制
+            
+        Returns:
+            Future对象，结果为搜索结果字典
+        """
+        data = _search_payload(query, project_ids, filters, limit)
+        future: Future = Future()
+        with self._batch_lock:
+            # 关闭后发送线程已退出，入队的请求不会再被处理
+            if self._closed.is_set():
+                future.set_result({"error": True, "message": "搜索代码失败: 插件已关闭"})
+                return future
+            if self._batch_thread is None:
+                self._batch_thread = threading.Thread(target=self._batch_sender,
+                                                      name="mcp-plugin-batch", daemon=True)
+                self._batch_thread.start()
+            self._batch_queue.append((data, future))
+        self._batch_event.set()
+        return future
+    
+    def _batch_sender(self) -> None:
+        """
+        后台发送线程，等待合并窗口结束后将队列中的请求一次发出
+        
+        Returns:
+            无返回值
+        """
+        window = 0.005
+        max_batch = 64
+        
+        while True:
+            self._batch_event.wait()
+            if not self._closed.is_set():
+                self._closed.wait(window)
+            
+            with self._batch_lock:
+                self._batch_event.clear()
+                pending = [self._batch_queue.popleft()
+                           for _ in range(min(max_batch, len(self._batch_queue)))]
+                if self._batch_queue:
+                    self._batch_event.set()
+            
+            if pending:
+                results = self.search_batch([data for data, _ in pending])
+                for i, (_, future) in enumerate(pending):
+                    if i < len(results):
+                        future.set_result(results[i])
+                    else:
+                        future.set_result({"error": True, "message": "批量搜索结果缺失"})
+            
+            if self._closed.is_set() and not self._batch_queue:
+                return
+    
     def get_code_context(self, file_path: str, line_number: int, 
                         context_lines: int = 10) -> Dict[str, Any]:
         """
@@ -188,23 +445,12 @@ class McpPlugin:
         Returns:
             代码上下文字典
         """
-        url = f"{self.server_url}/api/context"
         data = {
             "file_path": os.path.abspath(file_path),
             "line_number": line_number,
             "context_lines": context_lines
         }
-        
-        try:
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"获取代码上下文失败: {str(e)}")
-            return {
-                "error": True,
-                "message": f"获取代码上下文失败: {str(e)}"
-            }
+        return self._request("POST", self._urls["context"], "获取代码上下文", data)
     
     def get_projects(self) -> Dict[str, Any]:
         """
@@ -213,18 +459,7 @@ class McpPlugin:
         Returns:
             项目列表字典
         """
-        url = f"{self.server_url}/api/projects"
-        
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"获取项目列表失败: {str(e)}")
-            return {
-                "error": True,
-                "message": f"获取项目列表失败: {str(e)}"
-            }
+        return self._request("GET", self._urls["projects"], "获取项目列表", ttl=_PROJECTS_TTL)
     
     def delete_project(self, project_id: str) -> Dict[str, Any]:
         """
@@ -236,18 +471,7 @@ class McpPlugin:
         Returns:
             删除结果字典
         """
-        url = f"{self.server_url}/api/project/{project_id}"
-        
-        try:
-            response = requests.delete(url)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"删除项目索引失败: {str(e)}")
-            return {
-                "error": True,
-                "message": f"删除项目索引失败: {str(e)}"
-            }
+        return self._request("DELETE", self._urls["project"] + project_id, "删除项目索引")
     
     def health_check(self) -> bool:
         """
@@ -256,14 +480,7 @@ class McpPlugin:
         Returns:
             如果服务器正常则返回True，否则返回False
         """
-        url = f"{self.server_url}/health"
-        
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return True
-        except:
-            return False
+        return "error" not in self._request("GET", self._urls["health"], "健康检查")
     
     def format_for_ai(self, search_results: Dict[str, Any]) -> str:
         """
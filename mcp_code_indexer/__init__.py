@@ -4,19 +4,24 @@ A code indexing and retrieval system for AI models
 """
 
 import logging
+import importlib
+import threading
 from typing import Dict, Any, Optional
 
 from .config import Config
-from .component_registry import initialize_components, ComponentRegistry
+from .component_registry import initialize_components, get_registry, ComponentRegistry
 from .service_locator import get_service_by_type
 from .interfaces import IndexerProtocol, SearchEngineProtocol, FormatterProtocol, ContextManagerProtocol
 from .events import EventType, Event, publish, subscribe
 
-# For backward compatibility
-from .indexer import CodeIndexer
-from .project_identity import ProjectIdentifier
-from .search_engine import SearchEngine
-from .mcp_formatter import McpFormatter
+# For backward compatibility; resolved lazily by __getattr__ below so that
+# importing the package does not load the indexer's ML dependencies
+_LAZY_EXPORTS = {
+    "CodeIndexer": ".indexer",
+    "ProjectIdentifier": ".project_identity",
+    "SearchEngine": ".search_engine",
+    "McpFormatter": ".mcp_formatter",
+}
 
 __version__ = "0.1.0"
 __author__ = "MCP Team"
@@ -39,33 +44,51 @@ class MCPCodeIndexer:
         Args:
             config: Optional configuration dictionary
         """
-        # Create configuration
-        self.config = Config(config or {})
+        # Without an explicit configuration, reuse the components already
+        # initialized in this process (e.g. by the server) rather than
+        # building a second set with its own embedding model
+        registry = get_registry() if config is None else None
+        if registry is not None:
+            self.config = registry.config
+            self.registry = registry
+        else:
+            # Create configuration
+            self.config = Config(config or {})
+            
+            # Initialize components
+            self.registry = initialize_components(self.config)
+        
+        # Resolve services once; the registry is fixed after initialization
+        self._indexer = get_service_by_type(IndexerProtocol)
+        self._search_engine = get_service_by_type(SearchEngineProtocol)
+        self._formatter = get_service_by_type(FormatterProtocol)
+        self._context_manager = get_service_by_type(ContextManagerProtocol)
         
-        # Initialize components
-        self.registry = initialize_components(self.config)
+        # Pure delegations are bound directly to the component methods
+        self.natural_language_search = self._search_engine.natural_language_search
+        self.delete_project_index = self._indexer.delete_project_index
         
         logger.info(f"MCP Code Indexer v{__version__} initialized")
     
     @property
     def indexer(self) -> IndexerProtocol:
         """Get the code indexer component"""
-        return get_service_by_type(IndexerProtocol)
+        return self._indexer
     
     @property
     def search_engine(self) -> SearchEngineProtocol:
         """Get the search engine component"""
-        return get_service_by_type(SearchEngineProtocol)
+        return self._search_engine
     
     @property
     def formatter(self) -> FormatterProtocol:
         """Get the MCP formatter component"""
-        return get_service_by_type(FormatterProtocol)
+        return self._formatter
     
     @property
     def context_manager(self) -> ContextManagerProtocol:
         """Get the context manager component"""
-        return get_service_by_type(ContextManagerProtocol)
+        return self._context_manager
     
     def index_project(self, project_path: str, force_reindex: bool = False) -> str:
         """
@@ -78,7 +101,7 @@ class MCPCodeIndexer:
         Returns:
             Project ID
         """
-        return self.indexer.index_project(project_path, force_reindex=force_reindex)
+        return self._indexer.index_project(project_path, force_reindex=force_reindex)
     
     def search(self, query: str, project_ids=None, filters=None, limit: int = 10) -> Dict[str, Any]:
         """
@@ -93,8 +116,8 @@ class MCPCodeIndexer:
         Returns:
             Formatted search results
         """
-        results = self.search_engine.search(query, project_ids, filters, limit)
-        return self.formatter.format_search_results(results, query)
+        results = self._search_engine.search(query, project_ids, filters, limit)
+        return self._formatter.format_search_results(results, query)
     
     def get_code_context(self, file_path: str, line_number: int, context_lines: int = 10) -> Dict[str, Any]:
         """
@@ -108,8 +131,8 @@ class MCPCodeIndexer:
         Returns:
             Formatted code context
         """
-        context = self.search_engine.get_code_context(file_path, line_number, context_lines)
-        return self.formatter.format_code_context(context)
+        context = self._search_engine.get_code_context(file_path, line_number, context_lines)
+        return self._formatter.format_code_context(context)
     
     def find_similar_code(self, code: str, language: str = None, threshold: float = 0.7, limit: int = 5) -> Dict[str, Any]:
         """
@@ -124,23 +147,8 @@ class MCPCodeIndexer:
         Returns:
             Formatted similar code results
         """
-        results = self.search_engine.find_similar_code(code, language, threshold, limit)
-        return self.formatter.format_search_results(results, code)
-    
-    def natural_language_search(self, query: str, project_ids=None, filters=None, limit: int = 10) -> Dict[str, Any]:
-        """
-        Natural language search
-        
-        Args:
-            query: Natural language query
-            project_ids: Optional list of project IDs to search
-            filters: Optional search filters
-            limit: Maximum number of results
-            
-        Returns:
-            Formatted natural language search results
-        """
-        return self.search_engine.natural_language_search(query, project_ids, filters, limit)
+        results = self._search_engine.find_similar_code(code, language, threshold, limit)
+        return self._formatter.format_search_results(results, code)
     
     def get_indexed_projects(self) -> Dict[str, Any]:
         """
@@ -149,28 +157,37 @@ class MCPCodeIndexer:
         Returns:
             Formatted project information
         """
-        projects = self.indexer.get_indexed_projects()
-        return self.formatter.format_project_info({"projects": projects})
-    
-    def delete_project_index(self, project_id: str) -> bool:
-        """
-        Delete a project index
-        
-        Args:
-            project_id: Project ID
-            
-        Returns:
-            Success flag
-        """
-        return self.indexer.delete_project_index(project_id)
+        projects = self._indexer.get_indexed_projects()
+        return self._formatter.format_project_info({"projects": projects})
     
     def shutdown(self) -> None:
         """Shutdown the system"""
         logger.info("Shutting down MCP Code Indexer")
         publish(Event(EventType.SYSTEM_SHUTDOWN, {}, "mcp_code_indexer"))
 
-# Create default instance
-default_instance = MCPCodeIndexer()
+# Default instance, created on first use so that importing the package
+# does not initialize every component
+_default: Optional[MCPCodeIndexer] = None
+_default_lock = threading.Lock()
+
+def _get_default() -> MCPCodeIndexer:
+    """Get the default instance, creating it on first use"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = MCPCodeIndexer()
+    return _default
+
+def __getattr__(name: str) -> Any:
+    """Lazily provide the default instance and compatibility exports as module attributes"""
+    if name == "default_instance":
+        return _get_default()
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Convenience functions
 def index_project(project_path: str, force_reindex: bool = False) -> str:
@@ -184,7 +201,7 @@ def index_project(project_path: str, force_reindex: bool = False) -> str:
     Returns:
         Project ID
     """
-    return default_instance.index_project(project_path, force_reindex)
+    return _get_default().index_project(project_path, force_reindex)
 
 def search(query: str, project_ids=None, filters=None, limit: int = 10) -> Dict[str, Any]:
     """
@@ -199,7 +216,7 @@ def search(query: str, project_ids=None, filters=None, limit: int = 10) -> Dict[
     Returns:
         Formatted search results
     """
-    return default_instance.search(query, project_ids, filters, limit)
+    return _get_default().search(query, project_ids, filters, limit)
 
 def get_code_context(file_path: str, line_number: int, context_lines: int = 10) -> Dict[str, Any]:
     """
@@ -213,7 +230,7 @@ def get_code_context(file_path: str, line_number: int, context_lines: int = 10)
     Returns:
         Formatted code context
     """
-    return default_instance.get_code_context(file_path, line_number, context_lines)
+    return _get_default().get_code_context(file_path, line_number, context_lines)
 
 def find_similar_code(code: str, language: str = None, threshold: float = 0.7, limit: int = 5) -> Dict[str, Any]:
     """
@@ -228,7 +245,7 @@ def find_similar_code(code: str, language: str = None, threshold: float = 0.7, l
     Returns:
         Formatted similar code results
     """
-    return default_instance.find_similar_code(code, language, threshold, limit)
+    return _get_default().find_similar_code(code, language, threshold, limit)
 
 def natural_language_search(query: str, project_ids=None, filters=None, limit: int = 10) -> Dict[str, Any]:
     """
@@ -243,7 +260,7 @@ def natural_language_search(query: str, project_ids=None, filters=None, limit: i
     Returns:
         Formatted natural language search results
     """
-    return default_instance.natural_language_search(query, project_ids, filters, limit)
+    return _get_default().natural_language_search(query, project_ids, filters, limit)
 
 def get_indexed_projects() -> Dict[str, Any]:
     """
@@ -252,7 +269,7 @@ def get_indexed_projects() -> Dict[str, Any]:
     Returns:
         Formatted project information
     """
-    return default_instance.get_indexed_projects()
+    return _get_default().get_indexed_projects()
 
 def delete_project_index(project_id: str) -> bool:
     """
@@ -264,11 +281,12 @@ def delete_project_index(project_id: str) -> bool:
     Returns:
         Success flag
     """
-    return default_instance.delete_project_index(project_id)
+    return _get_default().delete_project_index(project_id)
 
 def shutdown() -> None:
     """Shutdown the system"""
-    default_instance.shutdown()
+    if _default is not None:
+        _default.shutdown()
 
 # Export for backward compatibility
 __all__ = [
@@ -4,25 +4,295 @@ Manages a multi-agent system for code analysis using the Environment
 """
 
 import os
+import sys
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-import json
-import re
+from typing import Dict, List, Any, Optional, Tuple, Callable
+import hashlib
+import pickle
+import mmap
 import threading
-import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
 
 from .environment.environment import Environment
+from .environment.constants import USER_REQUIREMENT
+from . import __version__
 from .config import Config
 from .indexer import CodeIndexer
 from .search_engine import SearchEngine
-from .utils.json_utils import convert_sets_to_lists
-from .external.modelscope import Message
+from .utils.json_utils import dumps_indented
+from .environment.schemas import Message, new_request_id
 
 logger = logging.getLogger(__name__)
 
+# Agent roles, interned so role comparisons are identity checks
+ROLE_CODE = sys.intern("code_analyzer")
+ROLE_SEARCH = sys.intern("search_agent")
+ROLE_QUALITY = sys.intern("quality_analyzer")
+ROLE_DEPENDENCY = sys.intern("dependency_analyzer")
+
+def _parse_command(content: str) -> Tuple[str, str]:
+    """
+    Split a "<command>: <argument>" request message
+    
+    Args:
+        content: Message content
+        
+    Returns:
+        Tuple of (command, argument); both empty if the content has no command
+    """
+    command, sep, argument = content.partition(":")
+    if not sep:
+        return "", ""
+    return command.strip(), argument.strip()
+
+def _ext(file_path: str) -> str:
+    """
+    Get a file extension without the dot, as os.path.splitext would
+    
+    Args:
+        file_path: File path
+        
+    Returns:
+        Extension, empty if the file name has none
+    """
+    dot = file_path.rfind('.')
+    name_start = max(file_path.rfind('/'), file_path.rfind('\\')) + 1
+    # Leading dots belong to the name, not the extension
+    while name_start < len(file_path) and file_path[name_start] == '.':
+        name_start += 1
+    return file_path[dot + 1:] if dot >= name_start else ''
+
+# Report templates, each rendered with a single format call
+_CODE_TEMPLATE = (
+    "Code analysis for {path}:\n"
+    "- Functions: {nf}\n"
+    "- Classes: {nc}\n"
+    "- Imports: {ni}\n"
+)
+_FUNC_TMPL = "- {name} (lines {start_line}-{end_line})\n"
+_SEARCH_RESULT_TEMPLATE = (
+    "{index}. {name} (lines {start_line}-{end_line})\n"
+    "   File: {file_path}\n"
+    "   ```{language}\n   {content}\n   ```\n\n"
+)
+_METRIC_TMPL = "- {0}: {1}\n"
+
+# On-disk analysis cache, reused across processes and restarts; AgentManager
+# applies the agents.analysis_cache_dir / agents.analysis_cache_max_mb settings
+_ANALYSIS_CACHE_DIR = Path.home() / ".mcp_cache" / "analysis"
+_ANALYSIS_CACHE_MAX_BYTES = 256 << 20
+# Bump when analyzer output changes so results pickled by older code are not reused
+_ANALYSIS_CACHE_VERSION = 1
+# The cache is pruned after this many writes
+_PRUNE_INTERVAL = 256
+_cache_writes = 0
+_prune_lock = threading.Lock()
+
+def _configure_analysis_cache(cache_dir: Optional[str], max_bytes: int) -> None:
+    """
+    Set the on-disk analysis cache location and size limit
+    
+    Args:
+        cache_dir: Cache directory, None to keep the default
+        max_bytes: Size limit in bytes
+        
+    Returns:
+        None
+    """
+    global _ANALYSIS_CACHE_DIR, _ANALYSIS_CACHE_MAX_BYTES
+    if cache_dir:
+        _ANALYSIS_CACHE_DIR = Path(cache_dir).expanduser()
+    _ANALYSIS_CACHE_MAX_BYTES = max_bytes
+
+def _prune_analysis_cache() -> None:
+    """
+    Delete the oldest cache entries until the cache fits its size limit
+    
+    Returns:
+        None
+    """
+    if not _prune_lock.acquire(blocking=False):
+        return  # Another thread is already pruning
+    try:
+        entries = []
+        total = 0
+        with os.scandir(_ANALYSIS_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".pkl"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        
+        if total <= _ANALYSIS_CACHE_MAX_BYTES:
+            return
+        
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= _ANALYSIS_CACHE_MAX_BYTES:
+                break
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to prune analysis cache: {str(e)}")
+    finally:
+        _prune_lock.release()
+
+def _disk_cached(kind: str, file_path: str, mtime_ns: int, size: int, language: str,
+                 compute: Callable[[], Any]) -> Any:
+    """
+    Load an analysis result from the on-disk cache, computing and storing it on a miss
+    
+    Args:
+        kind: Analysis kind, part of the cache key
+        file_path: File path
+        mtime_ns: Modification time in ns
+        size: File size
+        language: Programming language
+        compute: Function producing the result on a miss
+        
+    Returns:
+        Analysis result
+    """
+    key = (f"{__version__}:{_ANALYSIS_CACHE_VERSION}:{kind}:"
+           f"{os.path.abspath(file_path)}:{mtime_ns}:{size}:{language}")
+    cache_file = _ANALYSIS_CACHE_DIR / f"{hashlib.blake2b(key.encode()).hexdigest()}.pkl"
+    
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        pass
+    
+    result = compute()
+    
+    try:
+        _ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial pickle
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except (OSError, pickle.PicklingError, TypeError) as e:
+        logger.warning(f"Failed to save analysis cache: {cache_file}: {str(e)}")
+        return result
+    
+    # Every edit to a file adds a new entry, so trim the cache periodically
+    global _cache_writes
+    _cache_writes += 1
+    if _cache_writes % _PRUNE_INTERVAL == 0:
+        _prune_analysis_cache()
+    
+    return result
+
+def _file_key(file_path: str) -> Tuple[str, int, int]:
+    """
+    Build a cache key that changes whenever the file is modified
+    
+    Args:
+        file_path: File path
+        
+    Returns:
+        Tuple of (path, modification time in ns, size)
+    """
+    st = os.stat(file_path)
+    return file_path, st.st_mtime_ns, st.st_size
+
+# Files at least this large are memory-mapped instead of read into a buffer
+_MMAP_THRESHOLD = 1 << 20
+
+def _read_source(file_path: str) -> str:
+    """
+    Read a source file for analysis
+    
+    Not cached: the analyses built from the text are cached in memory and on
+    disk, so the text itself is released as soon as the analysis returns
+    
+    Args:
+        file_path: File path
+        
+    Returns:
+        File content
+    """
+    # Read the whole file with one system call and decode once, bypassing
+    # the buffered text IO layer
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        file_size = os.fstat(fd).st_size
+        if file_size >= _MMAP_THRESHOLD:
+            # Decode straight from the page cache, without an intermediate bytes copy
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                text = str(mapped, 'utf-8')
+        else:
+            data = os.read(fd, file_size)
+            chunks = [data]
+            while chunk := os.read(fd, 1 << 20):
+                chunks.append(chunk)
+            if len(chunks) > 1:
+                data = b"".join(chunks)
+            text = data.decode('utf-8')
+    finally:
+        os.close(fd)
+    
+    # Match text mode's universal newline translation
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+@lru_cache(maxsize=1024)
+def _analyze_structure(optimizer: Any, file_path: str, mtime_ns: int, size: int,
+                       language: str) -> Dict[str, Any]:
+    """
+    Analyze code structure, cached by optimizer and file version
+    
+    Args:
+        optimizer: Code optimizer providing the analyzer
+        file_path: File path
+        mtime_ns: Modification time in ns
+        size: File size
+        language: Programming language
+        
+    Returns:
+        Code analysis result
+    """
+    return _disk_cached(
+        "structure", file_path, mtime_ns, size, language,
+        lambda: optimizer.analyzer.analyze_code(_read_source(file_path), language)
+    )
+
+@lru_cache(maxsize=1024)
+def _analyze_quality(optimizer: Any, file_path: str, mtime_ns: int, size: int,
+                     language: str) -> Dict[str, Any]:
+    """
+    Analyze code quality, cached by optimizer and file version
+    
+    Args:
+        optimizer: Code optimizer
+        file_path: File path
+        mtime_ns: Modification time in ns
+        size: File size
+        language: Programming language
+        
+    Returns:
+        Code quality metrics
+    """
+    return _disk_cached(
+        "quality", file_path, mtime_ns, size, language,
+        lambda: optimizer.analyze_code_quality(_read_source(file_path), file_path, language)
+    )
+
 class Agent:
     """Base Agent class for code analysis"""
     
+    __slots__ = ("role", "environment", "_handlers")
+    
     def __init__(self, role: str, environment: Environment):
         """
         Initialize Agent
@@ -36,23 +306,48 @@ class Agent:
         """
         self.role = role
         self.environment = environment
+        # Request command -> handler returning the reply content
+        self._handlers: Dict[str, Callable[[str], str]] = {}
     
-    def process_messages(self, messages: List[Message]) -> Optional[Message]:
+    def process_messages(self, messages: List[Message]) -> List[Message]:
         """
         Process incoming messages
         
+        Every request in the batch is handled and the replies to each request
+        are combined into a single response message carrying its request id
+        
         Args:
             messages: List of messages to process
             
         Returns:
-            Response message or None
+            Response messages, one per answered request
         """
-        raise NotImplementedError("Subclasses must implement process_messages")
+        replies: Dict[str, List[str]] = {}
+        senders: Dict[str, str] = {}
+        handlers = self._handlers
+        for message in messages:
+            command, argument = _parse_command(message.content)
+            handler = handlers.get(command)
+            if handler is not None and argument:
+                replies.setdefault(message.request_id, []).append(handler(argument))
+                senders[message.request_id] = message.sent_from
+        
+        return [
+            Message(
+                content="\n".join(contents),
+                send_to=senders[request_id],
+                sent_from=self.role,
+                request_id=request_id
+            )
+            for request_id, contents in replies.items()
+        ]
 
 
 class CodeAnalyzerAgent(Agent):
     """Agent for analyzing code structure"""
     
+    __slots__ = ("indexer",)
+    
     def __init__(self, environment: Environment, indexer: CodeIndexer):
         """
         Initialize Code Analyzer Agent
@@ -64,74 +359,56 @@ class CodeAnalyzerAgent(Agent):
         Returns:
             None
         """
-        super().__init__("code_analyzer", environment)
+        super().__init__(ROLE_CODE, environment)
         self.indexer = indexer
+        self._handlers["analyze_file"] = self.analyze_file
     
-    def process_messages(self, messages: List[Message]) -> Optional[Message]:
+    def analyze_file(self, argument: str) -> str:
         """
-        Process incoming messages
+        Analyze the structure of a file
         
         Args:
-            messages: List of messages to process
+            argument: File path
             
         Returns:
-            Response message or None
+            Code analysis report
         """
-        for message in messages:
-            content = message.content
-            
-            # Check if this is a code analysis request
-            if "analyze_file" in content:
-                try:
-                    # Extract file path from message
-                    file_path_match = re.search(r"analyze_file:\s*([^\s]+)", content)
-                    if file_path_match:
-                        file_path = file_path_match.group(1)
-                        
-                        # Analyze code structure
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            code_content = f.read()
-                        
-                        # Use the optimizer's analyzer to analyze code
-                        language = os.path.splitext(file_path)[1][1:]
-                        analysis = self.indexer.optimizer.analyzer.analyze_code(code_content, language)
-                        
-                        # Create response message
-                        response_content = f"Code analysis for {file_path}:\n"
-                        response_content += f"- Functions: {len(analysis['functions'])}\n"
-                        response_content += f"- Classes: {len(analysis['classes'])}\n"
-                        response_content += f"- Imports: {len(analysis['imports'])}\n"
-                        
-                        # Add function details
-                        if analysis['functions']:
-                            response_content += "\nFunctions:\n"
-                            for func in analysis['functions']:
-                                response_content += f"- {func['name']} (lines {func['start_line']}-{func['end_line']})\n"
-                        
-                        # Add class details
-                        if analysis['classes']:
-                            response_content += "\nClasses:\n"
-                            for cls in analysis['classes']:
-                                response_content += f"- {cls['name']} (lines {cls['start_line']}-{cls['end_line']})\n"
-                        
-                        return Message(
-                            content=response_content,
-                            send_to="all",
-                            sent_from=self.role
-                        )
-                except Exception as e:
-                    return Message(
-                        content=f"Error analyzing code: {str(e)}",
-                        send_to="all",
-                        sent_from=self.role
-                    )
-        
-        return None
+        try:
+            # Extract file path from message
+            file_path = argument.split()[0]
+            
+            # Use the optimizer's analyzer to analyze code; unchanged files hit the cache
+            language = _ext(file_path)
+            analysis = _analyze_structure(self.indexer.optimizer, *_file_key(file_path), language)
+            
+            # Create response content
+            parts = [_CODE_TEMPLATE.format(
+                path=file_path,
+                nf=len(analysis['functions']),
+                nc=len(analysis['classes']),
+                ni=len(analysis['imports'])
+            )]
+            
+            # Add function details
+            if analysis['functions']:
+                parts.append("\nFunctions:\n")
+                parts.extend(_FUNC_TMPL.format_map(func) for func in analysis['functions'])
+            
+            # Add class details
+            if analysis['classes']:
+                parts.append("\nClasses:\n")
+                parts.extend(_FUNC_TMPL.format_map(cls) for cls in analysis['classes'])
+            
+            return "".join(parts)
+        except Exception as e:
+            return f"Error analyzing code: {str(e)}"
 
 
 class SearchAgent(Agent):
     """Agent for searching code"""
     
+    __slots__ = ("search_engine",)
+    
     def __init__(self, environment: Environment, search_engine: SearchEngine):
         """
         Initialize Search Agent
@@ -143,72 +420,56 @@ class SearchAgent(Agent):
         Returns:
             None
         """
-        super().__init__("search_agent", environment)
+        super().__init__(ROLE_SEARCH, environment)
         self.search_engine = search_engine
+        self._handlers["search"] = self.search
     
-    def process_messages(self, messages: List[Message]) -> Optional[Message]:
+    def search(self, argument: str) -> str:
         """
-        Process incoming messages
+        Search code
         
         Args:
-            messages: List of messages to process
+            argument: Search query
             
         Returns:
-            Response message or None
+            Search results report
         """
-        for message in messages:
-            content = message.content
-            
-            # Check if this is a search request
-            if "search:" in content:
-                try:
-                    # Extract query from message
-                    query_match = re.search(r"search:\s*(.+)", content)
-                    if query_match:
-                        query = query_match.group(1)
-                        
-                        # Search code
-                        results = self.search_engine.search(query, limit=5)
-                        
-                        # Create response message
-                        if not results:
-                            return Message(
-                                content=f"No results found for query: {query}",
-                                send_to="all",
-                                sent_from=self.role
-                            )
-                        
-                        response_content = f"Search results for '{query}':\n\n"
-                        
-                        for i, result in enumerate(results, 1):
-                            file_path = result.get("file_path", "")
-                            language = result.get("language", "text")
-                            start_line = result.get("start_line", 1)
-                            end_line = result.get("end_line", 1)
-                            content = result.get("content", "")
-                            
-                            response_content += f"{i}. {os.path.basename(file_path)} (lines {start_line}-{end_line})\n"
-                            response_content += f"   File: {file_path}\n"
-                            response_content += f"   ```{language}\n   {content}\n   ```\n\n"
-                        
-                        return Message(
-                            content=response_content,
-                            send_to="all",
-                            sent_from=self.role
-                        )
-                except Exception as e:
-                    return Message(
-                        content=f"Error searching code: {str(e)}",
-                        send_to="all",
-                        sent_from=self.role
-                    )
-        
-        return None
+        try:
+            # Extract query from message
+            query = argument
+            
+            # Search code
+            results = self.search_engine.search(query, limit=5)
+            
+            # Create response content
+            if not results:
+                return f"No results found for query: {query}"
+            
+            parts = [f"Search results for '{query}':\n\n"]
+            basename = os.path.basename
+            
+            for i, result in enumerate(results, 1):
+                file_path = result.get("file_path", "")
+                parts.append(_SEARCH_RESULT_TEMPLATE.format(
+                    index=i,
+                    name=basename(file_path),
+                    start_line=result.get("start_line", 1),
+                    end_line=result.get("end_line", 1),
+                    file_path=file_path,
+                    language=result.get("language", "text"),
+                    content=result.get("content", "")
+                ))
+            
+            return "".join(parts)
+        except Exception as e:
+            return f"Error searching code: {str(e)}"
 
 
 class QualityAnalyzerAgent(Agent):
     """Agent for analyzing code quality"""
     
+    __slots__ = ("indexer",)
+    
     def __init__(self, environment: Environment, indexer: CodeIndexer):
         """
         Initialize Quality Analyzer Agent
@@ -220,67 +481,46 @@ class QualityAnalyzerAgent(Agent):
         Returns:
             None
         """
-        super().__init__("quality_analyzer", environment)
+        super().__init__(ROLE_QUALITY, environment)
         self.indexer = indexer
+        self._handlers["analyze_quality"] = self.analyze_quality
     
-    def process_messages(self, messages: List[Message]) -> Optional[Message]:
+    def analyze_quality(self, argument: str) -> str:
         """
-        Process incoming messages
+        Analyze the quality of a file
         
         Args:
-            messages: List of messages to process
+            argument: File path
             
         Returns:
-            Response message or None
+            Code quality report
         """
-        for message in messages:
-            content = message.content
-            
-            # Check if this is a quality analysis request
-            if "analyze_quality:" in content:
-                try:
-                    # Extract file path from message
-                    file_path_match = re.search(r"analyze_quality:\s*([^\s]+)", content)
-                    if file_path_match:
-                        file_path = file_path_match.group(1)
-                        
-                        # Read file content
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            code_content = f.read()
-                        
-                        # Analyze code quality
-                        language = os.path.splitext(file_path)[1][1:]
-                        quality_metrics = self.indexer.optimizer.analyze_code_quality(
-                            code_content, file_path, language
-                        )
-                        
-                        # Create response message
-                        response_content = f"Code quality analysis for {file_path}:\n\n"
-                        
-                        for category, metrics in quality_metrics.items():
-                            response_content += f"## {category.capitalize()}\n"
-                            for metric, value in metrics.items():
-                                response_content += f"- {metric}: {value}\n"
-                            response_content += "\n"
-                        
-                        return Message(
-                            content=response_content,
-                            send_to="all",
-                            sent_from=self.role
-                        )
-                except Exception as e:
-                    return Message(
-                        content=f"Error analyzing code quality: {str(e)}",
-                        send_to="all",
-                        sent_from=self.role
-                    )
-        
-        return None
+        try:
+            # Extract file path from message
+            file_path = argument.split()[0]
+            
+            # Analyze code quality; unchanged files hit the cache
+            language = _ext(file_path)
+            quality_metrics = _analyze_quality(self.indexer.optimizer, *_file_key(file_path), language)
+            
+            # Create response content
+            parts = [f"Code quality analysis for {file_path}:\n\n"]
+            
+            for category, metrics in quality_metrics.items():
+                parts.append(f"## {category.capitalize()}\n")
+                parts.extend(_METRIC_TMPL.format(metric, value) for metric, value in metrics.items())
+                parts.append("\n")
+            
+            return "".join(parts)
+        except Exception as e:
+            return f"Error analyzing code quality: {str(e)}"
 
 
 class DependencyAnalyzerAgent(Agent):
     """Agent for analyzing code dependencies"""
     
+    __slots__ = ("indexer",)
+    
     def __init__(self, environment: Environment, indexer: CodeIndexer):
         """
         Initialize Dependency Analyzer Agent
@@ -292,53 +532,34 @@ class DependencyAnalyzerAgent(Agent):
         Returns:
             None
         """
-        super().__init__("dependency_analyzer", environment)
+        super().__init__(ROLE_DEPENDENCY, environment)
         self.indexer = indexer
+        self._handlers["analyze_dependencies"] = self.analyze_dependencies
     
-    def process_messages(self, messages: List[Message]) -> Optional[Message]:
+    def analyze_dependencies(self, argument: str) -> str:
         """
-        Process incoming messages
+        Analyze the dependencies of a project
         
         Args:
-            messages: List of messages to process
+            argument: Project path
             
         Returns:
-            Response message or None
+            Dependency analysis report
         """
-        for message in messages:
-            content = message.content
-            
-            # Check if this is a dependency analysis request
-            if "analyze_dependencies:" in content:
-                try:
-                    # Extract project path from message
-                    path_match = re.search(r"analyze_dependencies:\s*([^\s]+)", content)
-                    if path_match:
-                        project_path = path_match.group(1)
-                        
-                        # Analyze dependencies
-                        dependencies = self.indexer.optimizer.analyze_project_dependencies(project_path)
-                        
-                        # Convert sets to lists for JSON serialization
-                        serializable_dependencies = convert_sets_to_lists(dependencies)
-                        
-                        # Create response message
-                        response_content = f"Dependency analysis for {project_path}:\n\n"
-                        response_content += json.dumps(serializable_dependencies, indent=2)
-                        
-                        return Message(
-                            content=response_content,
-                            send_to="all",
-                            sent_from=self.role
-                        )
-                except Exception as e:
-                    return Message(
-                        content=f"Error analyzing dependencies: {str(e)}",
-                        send_to="all",
-                        sent_from=self.role
-                    )
-        
-        return None
+        try:
+            # Extract project path from message
+            project_path = argument.split()[0]
+            
+            # Analyze dependencies
+            dependencies = self.indexer.optimizer.analyze_project_dependencies(project_path)
+            
+            # Create response content; sets are serialized as lists by the encoder
+            response_content = f"Dependency analysis for {project_path}:\n\n"
+            response_content += dumps_indented(dependencies)
+            
+            return response_content
+        except Exception as e:
+            return f"Error analyzing dependencies: {str(e)}"
 
 
 class AgentManager:
@@ -365,31 +586,74 @@ class AgentManager:
         self.search_engine = search_engine
         
         # Initialize environment with roles
-        self.roles = ["code_analyzer", "search_agent", "quality_analyzer", "dependency_analyzer"]
-        self.environment = Environment(roles=self.roles)
+        self.roles = [ROLE_CODE, ROLE_SEARCH, ROLE_QUALITY, ROLE_DEPENDENCY]
+        # All agents run as coroutines on one event loop in a dedicated thread
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="agent-loop", daemon=True)
+        self._loop_thread.start()
+        
+        # Agents are in-process, so use local queues owned by the agent loop
+        # Requests are never reset, so keep the history bounded
+        self.environment = Environment(roles=self.roles, remote=False, loop=self._loop, max_history=100)
+        
+        # Agents notify waiting requests after storing a response
+        self._cv = threading.Condition()
+        # Request ids still being waited for, and their responses by (request id, role)
+        self._pending: set = set()
+        self._responses: Dict[Tuple[str, str], str] = {}
         
         # Initialize agents
         self.agents = {
-            "code_analyzer": CodeAnalyzerAgent(self.environment, self.indexer),
-            "search_agent": SearchAgent(self.environment, self.search_engine),
-            "quality_analyzer": QualityAnalyzerAgent(self.environment, self.indexer),
-            "dependency_analyzer": DependencyAnalyzerAgent(self.environment, self.indexer)
+            ROLE_CODE: CodeAnalyzerAgent(self.environment, self.indexer),
+            ROLE_SEARCH: SearchAgent(self.environment, self.search_engine),
+            ROLE_QUALITY: QualityAnalyzerAgent(self.environment, self.indexer),
+            ROLE_DEPENDENCY: DependencyAnalyzerAgent(self.environment, self.indexer)
         }
         
-        # Start agent processing threads
-        self._start_agent_threads()
+        # Let the environment deliver broadcast requests only to the agent handling them
+        self.environment.register_command_routes({
+            command: agent.role
+            for agent in self.agents.values()
+            for command in agent._handlers
+        })
+        
+        # Identical concurrent requests share one in-flight result
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Agent handlers and direct request/response calls run here
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent")
+        
+        # Apply the analysis cache settings and trim entries left by earlier runs
+        _configure_analysis_cache(
+            config.get("agents.analysis_cache_dir", None),
+            int(config.get("agents.analysis_cache_max_mb", 256) * (1 << 20))
+        )
+        self._executor.submit(_prune_analysis_cache)
+        
+        # Pay first-use costs now rather than on the first request
+        self._prewarm()
+        
+        # Start agent processing tasks
+        self._start_agent_tasks()
     
-    def _start_agent_threads(self) -> None:
-        """Start agent processing threads"""
-        for role, agent in self.agents.items():
-            thread = threading.Thread(
-                target=self._agent_loop,
-                args=(agent,),
-                daemon=True
-            )
-            thread.start()
+    def _prewarm(self) -> None:
+        """Run the analyzers once on a tiny snippet to warm up their lazy state"""
+        snippet = "def _(): pass\n"
+        try:
+            optimizer = self.indexer.optimizer
+            for language in list(optimizer.analyzer.parsers):
+                optimizer.analyzer.analyze_code(snippet, language)
+            optimizer.analyze_code_quality(snippet, "<prewarm>.py", "python")
+        except Exception as e:
+            logger.warning(f"Failed to prewarm analyzers: {str(e)}")
     
-    def _agent_loop(self, agent: Agent) -> None:
+    def _start_agent_tasks(self) -> None:
+        """Start one agent processing task per agent on the agent loop"""
+        for agent in self.agents.values():
+            asyncio.run_coroutine_threadsafe(self._agent_loop(agent), self._loop)
+    
+    async def _agent_loop(self, agent: Agent) -> None:
         """
         Agent processing loop
         
@@ -399,24 +663,98 @@ class AgentManager:
         Returns:
             None
         """
+        # Resolve the running loop once instead of on every batch
+        loop = asyncio.get_running_loop()
+        
         while True:
             try:
-                # Extract messages for this agent
-                messages = self.environment.extract_message_by_role(agent.role)
+                # Wait until messages arrive for this agent, then take the whole batch
+                messages = await self.environment.await_message_by_role(agent.role)
                 
                 if messages:
-                    # Process messages
-                    response = agent.process_messages(messages)
+                    # Process messages; handlers block on I/O and analysis, so run them off the loop
+                    responses = await loop.run_in_executor(self._executor, agent.process_messages, messages)
                     
-                    # Store response in environment
-                    if response:
+                    # Store responses in environment and wake up waiting requests
+                    for response in responses:
                         self.environment.store_message_from_role(agent.role, response)
-                
-                # Sleep to avoid busy waiting
-                time.sleep(0.1)
+                    if responses:
+                        with self._cv:
+                            for response in responses:
+                                # Late replies to abandoned requests are dropped
+                                if response.request_id in self._pending:
+                                    self._responses[(response.request_id, agent.role)] = response.content
+                            self._cv.notify_all()
             except Exception as e:
                 logger.error(f"Error in agent loop for {agent.role}: {str(e)}")
     
+    def _request(self, role: str, content: str, timeout: float) -> Optional[str]:
+        """
+        Send a request to an agent and wait for its reply
+        
+        Concurrent requests are told apart by their request id, so callers
+        never need to reset shared state
+        
+        Args:
+            role: Agent role to send the request to
+            content: Request content
+            timeout: Timeout in seconds
+            
+        Returns:
+            Response content, None if the timeout expired
+        """
+        request_id = new_request_id()
+        key = (request_id, role)
+        with self._cv:
+            self._pending.add(request_id)
+        
+        try:
+            self.environment.store_message_from_role(USER_REQUIREMENT, Message(
+                content=content,
+                send_to=role,
+                sent_from=USER_REQUIREMENT,
+                request_id=request_id
+            ))
+            
+            with self._cv:
+                self._cv.wait_for(lambda: key in self._responses, timeout=timeout)
+        finally:
+            # Stop accepting replies and take ours in one step, so a late reply
+            # can't be stored after the pop and leak
+            with self._cv:
+                self._pending.discard(request_id)
+                response = self._responses.pop(key, None)
+        
+        return response
+    
+    def _coalesced(self, key: Tuple[str, str], compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a request, or wait for an identical one that is already running
+        
+        Args:
+            key: Tuple of (method, argument) identifying the request
+            compute: Function performing the request
+            
+        Returns:
+            Request results
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        
+        if owner:
+            try:
+                future.set_result(compute())
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._inflight_lock:
+                    del self._inflight[key]
+        
+        return future.result()
+    
     def analyze_code(self, file_path: str) -> Dict[str, Any]:
         """
         Perform multi-agent code analysis
@@ -427,71 +765,35 @@ class AgentManager:
         Returns:
             Analysis results
         """
-        # Reset environment
-        self.environment.reset_env_queues()
-        
-        # Create analysis request messages
-        code_analysis_request = Message(
-            content=f"analyze_file: {file_path}",
-            send_to="code_analyzer",
-            sent_from="user"
-        )
-        
-        quality_analysis_request = Message(
-            content=f"analyze_quality: {file_path}",
-            send_to="quality_analyzer",
-            sent_from="user"
-        )
-        
-        # Store messages in environment
-        self.environment.store_message_from_role("user", code_analysis_request)
-        self.environment.store_message_from_role("user", quality_analysis_request)
+        return self._coalesced(("analyze_code", file_path), lambda: self._analyze_code(file_path))
+    
+    def _analyze_code(self, file_path: str) -> Dict[str, Any]:
+        """Run code analysis, see analyze_code"""
+        # Run both analyses concurrently, calling the agents directly
+        code_future = self._executor.submit(self.agents[ROLE_CODE].analyze_file, file_path)
+        quality_future = self._executor.submit(self.agents[ROLE_QUALITY].analyze_quality, file_path)
         
         # Wait for responses
-        start_time = time.time()
         timeout = 30  # 30 seconds timeout
+        done, _ = wait([code_future, quality_future], timeout=timeout)
         
-        results = {}
-        
-        while time.time() - start_time < timeout:
-            # Check if all agents have responded
-            history = self.environment.extract_all_history_message()
-            
-            # Extract responses from history
-            code_analysis_response = None
-            quality_analysis_response = None
-            
-            for message in history:
-                if message.sent_from == "code_analyzer":
-                    code_analysis_response = message.content
-                elif message.sent_from == "quality_analyzer":
-                    quality_analysis_response = message.content
-            
-            # If all responses received, break
-            if code_analysis_response and quality_analysis_response:
-                results = {
-                    "code_analysis": code_analysis_response,
-                    "quality_analysis": quality_analysis_response
-                }
-                break
-            
-            # Sleep before checking again
-            time.sleep(0.5)
-        
-        # If timeout reached, return partial results
-        if not results:
+        if len(done) == 2:
+            results = {
+                "code_analysis": code_future.result(),
+                "quality_analysis": quality_future.result()
+            }
+        else:
+            # If timeout reached, return partial results
             results = {
                 "error": "Analysis timeout",
                 "partial_results": {}
             }
             
             # Include any partial results
-            history = self.environment.extract_all_history_message()
-            for message in history:
-                if message.sent_from == "code_analyzer":
-                    results["partial_results"]["code_analysis"] = message.content
-                elif message.sent_from == "quality_analyzer":
-                    results["partial_results"]["quality_analysis"] = message.content
+            if code_future in done:
+                results["partial_results"]["code_analysis"] = code_future.result()
+            if quality_future in done:
+                results["partial_results"]["quality_analysis"] = quality_future.result()
         
         return results
     
@@ -505,46 +807,21 @@ class AgentManager:
         Returns:
             Dependency analysis results
         """
-        # Reset environment
-        self.environment.reset_env_queues()
-        
-        # Create dependency analysis request
-        dependency_request = Message(
-            content=f"analyze_dependencies: {project_path}",
-            send_to="dependency_analyzer",
-            sent_from="user"
-        )
-        
-        # Store message in environment
-        self.environment.store_message_from_role("user", dependency_request)
-        
-        # Wait for response
-        start_time = time.time()
+        return self._coalesced(("analyze_project_dependencies", project_path),
+                               lambda: self._analyze_project_dependencies(project_path))
+    
+    def _analyze_project_dependencies(self, project_path: str) -> Dict[str, Any]:
+        """Run dependency analysis, see analyze_project_dependencies"""
+        # Send dependency analysis request and wait for response
         timeout = 60  # 60 seconds timeout
+        response = self._request(ROLE_DEPENDENCY, f"analyze_dependencies: {project_path}", timeout)
         
-        results = {}
-        
-        while time.time() - start_time < timeout:
-            # Check if agent has responded
-            history = self.environment.extract_all_history_message()
-            
-            # Extract response from history
-            for message in history:
-                if message.sent_from == "dependency_analyzer":
-                    results = {
-                        "dependency_analysis": message.content
-                    }
-                    break
-            
-            # If response received, break
-            if results:
-                break
-            
-            # Sleep before checking again
-            time.sleep(0.5)
-        
-        # If timeout reached, return error
-        if not results:
+        if response is not None:
+            results = {
+                "dependency_analysis": response
+            }
+        else:
+            # If timeout reached, return error
             results = {
                 "error": "Dependency analysis timeout"
             }
@@ -561,48 +838,41 @@ class AgentManager:
         Returns:
             Search results
         """
-        # Reset environment
-        self.environment.reset_env_queues()
-        
-        # Create search request
-        search_request = Message(
-            content=f"search: {query}",
-            send_to="search_agent",
-            sent_from="user"
-        )
-        
-        # Store message in environment
-        self.environment.store_message_from_role("user", search_request)
-        
-        # Wait for response
-        start_time = time.time()
+        return self._coalesced(("search_code", query), lambda: self._search_code(query))
+    
+    def _search_code(self, query: str) -> Dict[str, Any]:
+        """Run a code search, see search_code"""
+        # Send search request and wait for response
         timeout = 30  # 30 seconds timeout
+        response = self._request(ROLE_SEARCH, f"search: {query}", timeout)
         
-        results = {}
-        
-        while time.time() - start_time < timeout:
-            # Check if agent has responded
-            history = self.environment.extract_all_history_message()
-            
-            # Extract response from history
-            for message in history:
-                if message.sent_from == "search_agent":
-                    results = {
-                        "search_results": message.content
-                    }
-                    break
-            
-            # If response received, break
-            if results:
-                break
-            
-            # Sleep before checking again
-            time.sleep(0.5)
-        
-        # If timeout reached, return error
-        if not results:
+        if response is not None:
+            results = {
+                "search_results": response
+            }
+        else:
+            # If timeout reached, return error
             results = {
                 "error": "Search timeout"
             }
         
-        return results
\ No newline at end of file
+        return results    
+    def dispose(self) -> None:
+        """Stop the agent loop and release the executor threads; called by the DI container on shutdown"""
+        if self._loop.is_closed():
+            return
+        
+        asyncio.run_coroutine_threadsafe(self._stop_loop(), self._loop)
+        self._loop_thread.join(timeout=5)
+        if not self._loop.is_running():
+            self._loop.close()
+        self._executor.shutdown(wait=False)
+    
+    async def _stop_loop(self) -> None:
+        """Cancel the agent tasks and stop the agent loop, run on that loop"""
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.get_running_loop().stop()
@@ -68,9 +68,7 @@ class CodeAnalyzer:
                 logger.error("PHP解析器初始化失败，这将导致PHP代码分析功能不可用")
                 
         except Exception as e:
-            logger.error(f"初始化解析器失败: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("初始化解析器失败: %s", e)
     
     # 已删除不再需要的方法
     
@@ -124,9 +122,7 @@ class CodeAnalyzer:
             
             return result
         except Exception as e:
-            logger.error(f"使用DLL解析器分析代码失败: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("使用DLL解析器分析代码失败: %s", e)
             # 如果解析失败，返回空结果
             return {
                 "imports": [],
@@ -496,9 +492,7 @@ class CodeAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"使用DLL解析器分析代码结构失败: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("使用DLL解析器分析代码结构失败: %s", e)
             # 如果解析失败，返回空结果
             return {
                 "functions": [],
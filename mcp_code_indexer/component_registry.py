@@ -3,12 +3,14 @@ Component Registry Module
 Provides a centralized registry for component initialization and registration
 """
 
-from typing import Dict, Any, Optional, List, Set, Type
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Set, Type, Mapping, Tuple
 import logging
 import importlib
 import inspect
 import pkgutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from .config import Config
@@ -16,14 +18,13 @@ from .di_container import register, register_instance
 from .service_locator import register_service, ServiceCategory, ServiceScope
 from .interfaces import IndexerProtocol, SearchEngineProtocol, FormatterProtocol, ContextManagerProtocol
 from .events import EventType, Event, publish, subscribe
-from .indexer import CodeIndexer
-from .search_engine import SearchEngine
-from .mcp_formatter import McpFormatter
-from .context_manager import ContextManager
-from .agent_manager import AgentManager
 
 logger = logging.getLogger(__name__)
 
+# Plugin package names found per (plugin directory, directory mtime), so
+# rebuilding a registry does not rescan an unchanged plugin directory
+_plugin_cache: Dict[Tuple[str, int], List[str]] = {}
+
 class ComponentRegistry:
     """Component registry for initializing and registering components"""
     
@@ -36,6 +37,7 @@ class ComponentRegistry:
         """
         self.config = config
         self.components: Dict[str, Any] = {}
+        self._components_view = MappingProxyType(self.components)
         self.initialized = False
     
     def initialize(self) -> None:
@@ -54,8 +56,8 @@ class ComponentRegistry:
         
         # Register explicitly configured plugins
         plugin_configs = self.config.get("plugins.enabled", [])
-        for plugin_config in plugin_configs:
-            self._register_plugin(plugin_config)
+        for plugin_name, module in self._import_plugins(plugin_configs):
+            self._register_plugin(plugin_name, module)
         
         self.initialized = True
         
@@ -70,6 +72,13 @@ class ComponentRegistry:
     
     def _register_core_components(self) -> None:
         """Register core system components"""
+        # Subsystems are imported here rather than at module level so that
+        # importing the registry does not pull in the indexer's ML dependencies
+        from .context_manager import ContextManager
+        from .indexer import CodeIndexer
+        from .search_engine import SearchEngine
+        from .mcp_formatter import McpFormatter
+        
         # Create and register context manager
         cache_dir = self.config.get("storage.cache_dir")
         context_manager = ContextManager(cache_dir)
@@ -109,11 +118,12 @@ class ComponentRegistry:
         
         # Create and register agent manager if enabled
         if self.config.get("agents.enabled", False):
+            from .agent_manager import AgentManager
             agent_manager = AgentManager(self.config, indexer, search_engine)
             self._register_component(
                 "agent_manager",
                 agent_manager,
-                None,  # No interface defined for AgentManager yet
+                AgentManager,  # No interface yet; registered under its class so it is disposed on shutdown
                 ServiceCategory.AGENT
             )
     
@@ -161,41 +171,94 @@ class ComponentRegistry:
             return
         
         # Add plugin directory to Python path
-        sys.path.insert(0, str(plugin_path))
-        
-        # Discover plugins
-        for _, name, is_pkg in pkgutil.iter_modules([str(plugin_path)]):
-            if is_pkg and name.startswith("mcp_"):
-                try:
-                    # Import plugin module
-                    plugin_module = importlib.import_module(name)
-                    
-                    # Look for plugin registration function
-                    if hasattr(plugin_module, "register_plugin"):
-                        plugin_module.register_plugin(self)
-                        logger.info(f"Registered plugin {name}")
-                    else:
-                        logger.warning(f"Plugin {name} has no register_plugin function")
-                except Exception as e:
-                    logger.error(f"Error loading plugin {name}: {str(e)}")
+        plugin_dir_str = str(plugin_path)
+        if plugin_dir_str not in sys.path:
+            sys.path.insert(0, plugin_dir_str)
+        
+        # Discover plugins, reusing the previous scan if the directory is unchanged
+        cache_key = (str(plugin_path.resolve()), plugin_path.stat().st_mtime_ns)
+        plugin_names = _plugin_cache.get(cache_key)
+        if plugin_names is None:
+            plugin_names = [
+                name for _, name, is_pkg in pkgutil.iter_modules([plugin_dir_str])
+                if is_pkg and name.startswith("mcp_")
+            ]
+            _plugin_cache[cache_key] = plugin_names
+        
+        for name in plugin_names:
+            try:
+                # Import plugin module, skipping the import machinery if already loaded
+                plugin_module = sys.modules.get(name) or importlib.import_module(name)
+                
+                # Look for plugin registration function
+                if hasattr(plugin_module, "register_plugin"):
+                    plugin_module.register_plugin(self)
+                    logger.info(f"Registered plugin {name}")
+                else:
+                    logger.warning(f"Plugin {name} has no register_plugin function")
+            except Exception as e:
+                logger.error(f"Error loading plugin {name}: {str(e)}")
     
-    def _register_plugin(self, plugin_config: Dict[str, Any]) -> None:
+    @staticmethod
+    def _import_plugin_module(module_path: str) -> Any:
         """
-        Register a plugin from configuration
+        Import a plugin module, returning the exception instead of raising it
         
         Args:
-            plugin_config: Plugin configuration
+            module_path: Dotted module path
+            
+        Returns:
+            Imported module or the exception raised while importing it
         """
-        plugin_name = plugin_config.get("name")
-        plugin_module = plugin_config.get("module")
+        try:
+            return importlib.import_module(module_path)
+        except Exception as e:
+            return e
+    
+    def _import_plugins(self, plugin_configs: List[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+        """
+        Import configured plugin modules
         
-        if not plugin_name or not plugin_module:
-            logger.warning("Invalid plugin configuration: missing name or module")
-            return
+        Imports are mostly file reads and bytecode loading, so several plugins
+        are imported concurrently. Results keep the configured order.
         
+        Args:
+            plugin_configs: Plugin configurations
+            
+        Returns:
+            List of (plugin name, module or import exception)
+        """
+        plugins = []
+        for plugin_config in plugin_configs:
+            plugin_name = plugin_config.get("name")
+            plugin_module = plugin_config.get("module")
+            
+            if not plugin_name or not plugin_module:
+                logger.warning("Invalid plugin configuration: missing name or module")
+                continue
+            
+            plugins.append((plugin_name, plugin_module))
+        
+        module_paths = [module_path for _, module_path in plugins]
+        if len(module_paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(module_paths))) as pool:
+                modules = list(pool.map(self._import_plugin_module, module_paths))
+        else:
+            modules = [self._import_plugin_module(module_path) for module_path in module_paths]
+        
+        return [(plugin_name, module) for (plugin_name, _), module in zip(plugins, modules)]
+    
+    def _register_plugin(self, plugin_name: str, module: Any) -> None:
+        """
+        Register an imported plugin module
+        
+        Args:
+            plugin_name: Plugin name from configuration
+            module: Plugin module or the exception raised while importing it
+        """
         try:
-            # Import plugin module
-            module = importlib.import_module(plugin_module)
+            if isinstance(module, Exception):
+                raise module
             
             # Look for plugin registration function
             if hasattr(module, "register_plugin"):
@@ -218,14 +281,26 @@ class ComponentRegistry:
         """
         return self.components.get(component_id)
     
-    def get_all_components(self) -> Dict[str, Any]:
+    def get_all_components(self) -> Mapping[str, Any]:
         """
         Get all registered components
         
+        Returns:
+            Read-only live view of component ID to instance
+        """
+        return self._components_view
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of all registered components
+        
         Returns:
             Dictionary of component ID to instance
         """
-        return self.components.copy()
+        return dict(self.components)
+
+# Most recently initialized registry, shared by callers in this process
+_registry: Optional[ComponentRegistry] = None
 
 def initialize_components(config: Config) -> ComponentRegistry:
     """
@@ -237,6 +312,17 @@ def initialize_components(config: Config) -> ComponentRegistry:
     Returns:
         Component registry
     """
+    global _registry
     registry = ComponentRegistry(config)
     registry.initialize()
-    return registry
\ No newline at end of file
+    _registry = registry
+    return registry
+
+def get_registry() -> Optional[ComponentRegistry]:
+    """
+    Get the component registry initialized in this process
+    
+    Returns:
+        Component registry or None if components have not been initialized
+    """
+    return _registry
\ No newline at end of file
@@ -12,6 +12,7 @@ import logging
 from pathlib import Path
 import time
 import heapq
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
 from .code_optimizer import CodeOptimizer
@@ -74,6 +75,8 @@ class ContextCache:
         self.max_size = max_size
         self.items: Dict[str, ContextItem] = {}
         self.compressed_items: Dict[str, ContextItem] = {}
+        # 缓存由请求线程与索引线程共享，查找、写入和驱逐都在锁内完成
+        self._lock = threading.Lock()
         self._load_cache()
         
     def _load_cache(self):
@@ -103,13 +106,17 @@ class ContextCache:
         except Exception as e:
             logger.error(f"加载上下文缓存失败: {str(e)}")
     
-    def _save_cache(self):
-        """保存缓存"""
+    def _save_cache(self, items: Optional[List[ContextItem]] = None):
+        """保存缓存，items为调用方在锁内取得的快照"""
         try:
+            if items is None:
+                with self._lock:
+                    items = list(self.items.values()) + list(self.compressed_items.values())
+            
             cache_file = self.cache_dir / "context_cache.json"
             items_data = []
             
-            for item in list(self.items.values()) + list(self.compressed_items.values()):
+            for item in items:
                 items_data.append({
                     'content': item.content,
                     'type': item.context_type.value,
@@ -136,42 +143,43 @@ class ContextCache:
         """获取上下文项"""
         key = f"{file_path}:{start_line}-{end_line}"
         
-        # 先查找未压缩的缓存
-        if key in self.items:
-            item = self.items[key]
-            item.last_used = time.time()
-            item.access_count += 1
-            return item
+        with self._lock:
+            # 先查找未压缩的缓存，再查找压缩的缓存
+            item = self.items.get(key)
+            if item is None:
+                item = self.compressed_items.get(key)
+            if item is None:
+                return None
             
-        # 再查找压缩的缓存
-        if key in self.compressed_items:
-            item = self.compressed_items[key]
             item.last_used = time.time()
             item.access_count += 1
             return item
-            
-        return None
     
     def put(self, item: ContextItem):
         """存储上下文项"""
         key = self._get_key(item)
+        snapshot = None
         
-        # 检查缓存大小
-        if len(self.items) + len(self.compressed_items) >= self.max_size:
-            self._evict_items()
-            
-        # 存储项
-        if item.compressed:
-            self.compressed_items[key] = item
-        else:
-            self.items[key] = item
-            
-        # 定期保存缓存
-        if (len(self.items) + len(self.compressed_items)) % 100 == 0:
-            self._save_cache()
+        with self._lock:
+            # 检查缓存大小
+            if len(self.items) + len(self.compressed_items) >= self.max_size:
+                self._evict_items()
+                
+            # 存储项
+            if item.compressed:
+                self.compressed_items[key] = item
+            else:
+                self.items[key] = item
+                
+            # 定期保存缓存，锁内只取快照，写文件在锁外进行
+            if (len(self.items) + len(self.compressed_items)) % 100 == 0:
+                snapshot = list(self.items.values()) + list(self.compressed_items.values())
+        
+        if snapshot is not None:
+            self._save_cache(snapshot)
     
     def _evict_items(self):
-        """驱逐缓存项"""
+        """驱逐缓存项，调用方需持有锁"""
         # 合并所有项
         all_items = list(self.items.values()) + list(self.compressed_items.values())
         
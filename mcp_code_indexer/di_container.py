@@ -3,13 +3,13 @@ Dependency Injection Container Module
 Provides a centralized container for managing component dependencies and lifecycle
 """
 
-from typing import Dict, Any, Type, TypeVar, Optional, Callable, List, Set
+from typing import Dict, Any, Type, TypeVar, Optional, Callable, List, Set, Iterable
 import logging
 import threading
 from enum import Enum
 
 from .interfaces import IndexerProtocol, SearchEngineProtocol, FormatterProtocol, ContextManagerProtocol
-from .events import EventType, Event, publish, subscribe
+from .events import EventType, Event, publish, subscribe, has_subscribers
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +37,11 @@ class ComponentLifecycle(Enum):
 class ComponentRegistration:
     """Component registration information"""
     
+    __slots__ = (
+        "interface_type", "implementation_type", "factory", "scope",
+        "dependencies", "tags", "instance", "initialized", "build", "dispose",
+    )
+    
     def __init__(self, 
                  interface_type: Type, 
                  implementation_type: Type, 
@@ -63,6 +68,10 @@ class ComponentRegistration:
         self.tags = tags or set()
         self.instance = None
         self.initialized = False
+        # Zero-argument builder compiled by the container at registration
+        self.build: Optional[Callable[[], Any]] = None
+        # Bound dispose method of the singleton instance, looked up once when stored
+        self.dispose: Optional[Callable[[], Any]] = None
 
 class DIContainer:
     """Dependency Injection Container"""
@@ -72,10 +81,13 @@ class DIContainer:
     
     def __new__(cls):
         """Singleton pattern implementation"""
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(DIContainer, cls).__new__(cls)
-                cls._instance._initialized = False
+        # Double-checked locking: only the first construction takes the lock
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(DIContainer, cls).__new__(cls)
+                    instance._initialized = False
+                    cls._instance = instance
         return cls._instance
     
     def __init__(self):
@@ -83,8 +95,21 @@ class DIContainer:
         if self._initialized:
             return
             
+        # Registrations, instances and the lookup indexes are copy-on-write:
+        # writers publish a new dict under _resolve_lock, readers use whatever
+        # dict they load without locking
         self._registrations: Dict[Type, ComponentRegistration] = {}
         self._instances: Dict[Type, Any] = {}
+        # Serializes singleton creation and all writes; reentrant because
+        # creating a component resolves its dependencies through resolve()
+        self._resolve_lock = threading.RLock()
+        # Memoized resolve_all / resolve_by_tag results, cleared on registration
+        self._resolve_all_cache: Dict[Type, List[Any]] = {}
+        self._tag_cache: Dict[str, List[Any]] = {}
+        # Tag -> interface types carrying it, in registration order
+        self._tag_index: Dict[str, Dict[Type, None]] = {}
+        # Class -> interface types whose implementation has it in its MRO
+        self._impl_index: Dict[Type, Dict[Type, None]] = {}
         self._initialized = True
         logger.info("DI Container initialized")
         
@@ -118,7 +143,7 @@ class DIContainer:
             tags=tags
         )
         
-        self._registrations[interface_type] = registration
+        self._add_registration(interface_type, registration)
         logger.debug(f"Registered {interface_type.__name__} -> {implementation_type.__name__}")
     
     def register_instance(self, interface_type: Type[T], instance: T, tags: Optional[Set[str]] = None) -> None:
@@ -140,8 +165,9 @@ class DIContainer:
         registration.instance = instance
         registration.initialized = True
         
-        self._registrations[interface_type] = registration
-        self._instances[interface_type] = instance
+        with self._resolve_lock:
+            self._store_instance(registration, instance)
+            self._add_registration(interface_type, registration)
         
         logger.debug(f"Registered instance of {interface_type.__name__}")
     
@@ -155,17 +181,44 @@ class DIContainer:
         Returns:
             Component instance or None if not registered
         """
-        # Check if already instantiated for singleton scope
-        if interface_type in self._instances:
-            return self._instances[interface_type]
+        # Fast path: singleton already instantiated, no lock needed
+        instance = self._instances.get(interface_type)
+        if instance is not None:
+            return instance
         
         # Check if registered
-        if interface_type not in self._registrations:
+        registration = self._registrations.get(interface_type)
+        if registration is None:
             logger.warning(f"No registration found for {interface_type.__name__}")
             return None
         
-        registration = self._registrations[interface_type]
+        # Transient and scoped components are never cached, so creating them
+        # needs no lock; only singleton creation is serialized
+        if registration.scope != ComponentScope.SINGLETON:
+            return self._instantiate(registration)
+        
+        with self._resolve_lock:
+            # Another thread may have created the singleton while we waited
+            instance = self._instances.get(interface_type)
+            if instance is not None:
+                return instance
+            
+            instance = self._instantiate(registration)
+            if instance is not None:
+                self._store_instance(registration, instance)
+        
+        return instance
+    
+    def _instantiate(self, registration: ComponentRegistration) -> Optional[Any]:
+        """
+        Create a component instance and publish its lifecycle events
         
+        Args:
+            registration: Component registration
+            
+        Returns:
+            Component instance or None if creation failed
+        """
         # Publish lifecycle event
         self._publish_lifecycle_event(registration, ComponentLifecycle.INITIALIZING)
         
@@ -173,10 +226,6 @@ class DIContainer:
         instance = self._create_instance(registration)
         
         if instance is not None:
-            # Store instance for singleton scope
-            if registration.scope == ComponentScope.SINGLETON:
-                self._instances[interface_type] = instance
-            
             # Mark as initialized
             registration.initialized = True
             
@@ -195,15 +244,11 @@ class DIContainer:
         Returns:
             List of component instances
         """
-        instances = []
-        
-        for reg_type, registration in self._registrations.items():
-            if issubclass(registration.implementation_type, interface_type):
-                instance = self.resolve(reg_type)
-                if instance is not None:
-                    instances.append(instance)
-        
-        return instances
+        return self._resolve_cached(
+            self._resolve_all_cache,
+            interface_type,
+            lambda: list(self._impl_index.get(interface_type, ()))
+        )
     
     def resolve_by_tag(self, tag: str) -> List[Any]:
         """
@@ -215,15 +260,128 @@ class DIContainer:
         Returns:
             List of component instances
         """
+        return self._resolve_cached(
+            self._tag_cache,
+            tag,
+            lambda: list(self._tag_index.get(tag, ()))
+        )
+    
+    def _resolve_cached(self, cache: Dict[Any, List[Any]], key: Any,
+                        candidates: Callable[[], Iterable[Type]]) -> List[Any]:
+        """
+        Resolve a set of registrations, memoizing the result
+        
+        Results are only memoized when every match is a resolved singleton,
+        so transient components are still created on each call.
+        
+        Args:
+            cache: Cache to read and populate
+            key: Cache key
+            candidates: Returns the registered interface types to resolve
+            
+        Returns:
+            List of component instances
+        """
+        cached = cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
         instances = []
+        cacheable = True
+        
+        for reg_type in candidates():
+            instance = self.resolve(reg_type)
+            if instance is None or self._registrations[reg_type].scope != ComponentScope.SINGLETON:
+                cacheable = False
+            if instance is not None:
+                instances.append(instance)
+        
+        if cacheable:
+            cache[key] = instances
+        
+        return list(instances)
+    
+    def _add_registration(self, interface_type: Type, registration: ComponentRegistration) -> None:
+        """
+        Store a registration and update the lookup indexes
         
-        for reg_type, registration in self._registrations.items():
-            if tag in registration.tags:
-                instance = self.resolve(reg_type)
-                if instance is not None:
-                    instances.append(instance)
+        Args:
+            interface_type: Interface type
+            registration: Component registration
+        """
+        registration.build = self._compile_builder(registration)
+        
+        with self._resolve_lock:
+            tag_index = dict(self._tag_index)
+            impl_index = dict(self._impl_index)
+            
+            previous = self._registrations.get(interface_type)
+            if previous is not None:
+                for tag in previous.tags:
+                    tag_index[tag] = {t: None for t in tag_index.get(tag, ()) if t is not interface_type}
+                for base in previous.implementation_type.__mro__:
+                    impl_index[base] = {t: None for t in impl_index.get(base, ()) if t is not interface_type}
+            
+            for tag in registration.tags:
+                tag_index[tag] = {**tag_index.get(tag, {}), interface_type: None}
+            # Walk the MRO once here instead of calling issubclass per resolve_all
+            for base in registration.implementation_type.__mro__:
+                impl_index[base] = {**impl_index.get(base, {}), interface_type: None}
+            
+            self._registrations = {**self._registrations, interface_type: registration}
+            self._tag_index = tag_index
+            self._impl_index = impl_index
+            self._invalidate_resolve_caches()
+    
+    def _store_instance(self, registration: ComponentRegistration, instance: Any) -> None:
+        """
+        Publish a singleton instance; callers hold _resolve_lock
+        
+        Args:
+            registration: Component registration
+            instance: Component instance
+        """
+        dispose = getattr(instance, "dispose", None)
+        registration.dispose = dispose if callable(dispose) else None
+        self._instances = {**self._instances, registration.interface_type: instance}
+    
+    def _compile_builder(self, registration: ComponentRegistration) -> Callable[[], Any]:
+        """
+        Compile a zero-argument builder for a registration
+        
+        The factory (or constructor) and dependency list are bound once, and
+        dependencies that are already instantiated singletons are read
+        straight from the instance cache instead of going through resolve().
         
-        return instances
+        Args:
+            registration: Component registration
+            
+        Returns:
+            Callable creating a new component instance
+        """
+        # Use factory if provided, otherwise the constructor
+        target = registration.factory if registration.factory is not None else registration.implementation_type
+        dependencies = tuple(registration.dependencies)
+        
+        if not dependencies:
+            return target
+        
+        resolve = self.resolve
+        
+        def build() -> Any:
+            instances = self._instances
+            args = []
+            for dep_type in dependencies:
+                instance = instances.get(dep_type)
+                args.append(instance if instance is not None else resolve(dep_type))
+            return target(*args)
+        
+        return build
+    
+    def _invalidate_resolve_caches(self) -> None:
+        """Clear memoized resolve_all / resolve_by_tag results"""
+        self._resolve_all_cache.clear()
+        self._tag_cache.clear()
     
     def _create_instance(self, registration: ComponentRegistration) -> Optional[Any]:
         """
@@ -236,21 +394,11 @@ class DIContainer:
             Component instance or None if creation failed
         """
         try:
-            # Use factory if provided
-            if registration.factory is not None:
-                # Resolve dependencies
-                dependencies = [self.resolve(dep_type) for dep_type in registration.dependencies]
-                
-                # Create instance using factory
-                instance = registration.factory(*dependencies)
-            else:
-                # Resolve dependencies
-                dependencies = [self.resolve(dep_type) for dep_type in registration.dependencies]
-                
-                # Create instance using constructor
-                instance = registration.implementation_type(*dependencies)
+            build = registration.build
+            if build is None:
+                build = registration.build = self._compile_builder(registration)
             
-            return instance
+            return build()
         except Exception as e:
             logger.error(f"Error creating instance of {registration.implementation_type.__name__}: {str(e)}")
             
@@ -274,8 +422,15 @@ class DIContainer:
             registration: Component registration
             lifecycle: Lifecycle event
         """
+        event_type = EventType.COMPONENT_INITIALIZED if lifecycle == ComponentLifecycle.INITIALIZED else EventType.COMPONENT_ERROR
+        
+        # Lifecycle events are published on every resolve; skip building them
+        # when nothing is listening
+        if not has_subscribers(event_type):
+            return
+        
         publish(Event(
-            EventType.COMPONENT_INITIALIZED if lifecycle == ComponentLifecycle.INITIALIZED else EventType.COMPONENT_ERROR,
+            event_type,
             {
                 "component": registration.implementation_type.__name__,
                 "lifecycle": lifecycle.value
@@ -292,18 +447,20 @@ class DIContainer:
         """
         logger.info("Shutting down components...")
         
-        # Dispose components in reverse registration order
-        for interface_type, registration in reversed(list(self._registrations.items())):
-            if registration.initialized and interface_type in self._instances:
-                instance = self._instances[interface_type]
-                
+        # Dispose components in reverse registration order; the copy-on-write
+        # maps are never mutated in place, so they can be iterated directly
+        registrations = self._registrations
+        instances = self._instances
+        for interface_type in reversed(registrations):
+            registration = registrations[interface_type]
+            if registration.initialized and interface_type in instances:
                 # Publish lifecycle event
                 self._publish_lifecycle_event(registration, ComponentLifecycle.DISPOSING)
                 
                 # Call dispose method if available
-                if hasattr(instance, "dispose") and callable(getattr(instance, "dispose")):
+                if registration.dispose is not None:
                     try:
-                        instance.dispose()
+                        registration.dispose()
                     except Exception as e:
                         logger.error(f"Error disposing {registration.implementation_type.__name__}: {str(e)}")
                 
@@ -311,7 +468,12 @@ class DIContainer:
                 self._publish_lifecycle_event(registration, ComponentLifecycle.DISPOSED)
         
         # Clear instances
-        self._instances.clear()
+        with self._resolve_lock:
+            self._instances = {}
+        self._invalidate_resolve_caches()
+
+# Process-wide container, bound once so the helpers below skip DIContainer()
+_container = DIContainer()
 
 # Convenience functions for working with the DI container
 def register(interface_type: Type[T], 
@@ -331,7 +493,7 @@ def register(interface_type: Type[T],
         dependencies: List of dependency types
         tags: Optional tags for component categorization
     """
-    DIContainer().register(interface_type, implementation_type, factory, scope, dependencies, tags)
+    _container.register(interface_type, implementation_type, factory, scope, dependencies, tags)
 
 def register_instance(interface_type: Type[T], instance: T, tags: Optional[Set[str]] = None) -> None:
     """
@@ -342,7 +504,7 @@ def register_instance(interface_type: Type[T], instance: T, tags: Optional[Set[s
         instance: Component instance
         tags: Optional tags for component categorization
     """
-    DIContainer().register_instance(interface_type, instance, tags)
+    _container.register_instance(interface_type, instance, tags)
 
 def resolve(interface_type: Type[T]) -> Optional[T]:
     """
@@ -354,7 +516,7 @@ def resolve(interface_type: Type[T]) -> Optional[T]:
     Returns:
         Component instance or None if not registered
     """
-    return DIContainer().resolve(interface_type)
+    return _container.resolve(interface_type)
 
 def resolve_all(interface_type: Type[T]) -> List[T]:
     """
@@ -366,7 +528,7 @@ def resolve_all(interface_type: Type[T]) -> List[T]:
     Returns:
         List of component instances
     """
-    return DIContainer().resolve_all(interface_type)
+    return _container.resolve_all(interface_type)
 
 def resolve_by_tag(tag: str) -> List[Any]:
     """
@@ -378,4 +540,4 @@ def resolve_by_tag(tag: str) -> List[Any]:
     Returns:
         List of component instances
     """
-    return DIContainer().resolve_by_tag(tag)
\ No newline at end of file
+    return _container.resolve_by_tag(tag)
\ No newline at end of file
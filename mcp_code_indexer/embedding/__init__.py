@@ -3,13 +3,39 @@ Embedding Model Abstraction Layer
 Provides a unified interface for different embedding models
 """
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Type
+from functools import lru_cache
+import importlib
 import logging
 
 from ..config import Config
 
 logger = logging.getLogger(__name__)
 
+# Model name prefix -> (backend module, class name); backends are imported on first use
+_BACKENDS = (
+    ("intfloat/e5-", ".e5_model", "E5EmbeddingModel"),
+    ("BAAI/bge-", ".bge_model", "BGEEmbeddingModel"),
+    ("thenlper/gte-", ".gte_model", "GTEEmbeddingModel"),
+)
+
+# Backend for model names matching no prefix
+_DEFAULT_BACKEND = (".sentence_transformer_model", "SentenceTransformerModel")
+
+@lru_cache(maxsize=None)
+def _load_backend(module_name: str, class_name: str) -> Type["EmbeddingModel"]:
+    """
+    Import an embedding backend class
+    
+    Args:
+        module_name: Module name relative to this package
+        class_name: Backend class name
+        
+    Returns:
+        Backend class
+    """
+    return getattr(importlib.import_module(module_name, __name__), class_name)
+
 class EmbeddingModel:
     """
     Abstract base class for embedding models
@@ -31,18 +57,13 @@ class EmbeddingModel:
         model_name = config.get("indexer.embedding_model", "sentence-transformers/all-MiniLM-L6-v2")
         quantization = config.get("indexer.quantization", None)
         
-        if model_name.startswith("intfloat/e5-"):
-            from .e5_model import E5EmbeddingModel
-            return E5EmbeddingModel(model_name, quantization, config)
-        elif model_name.startswith("BAAI/bge-"):
-            from .bge_model import BGEEmbeddingModel
-            return BGEEmbeddingModel(model_name, quantization, config)
-        elif model_name.startswith("thenlper/gte-"):
-            from .gte_model import GTEEmbeddingModel
-            return GTEEmbeddingModel(model_name, quantization, config)
-        else:
-            from .sentence_transformer_model import SentenceTransformerModel
-            return SentenceTransformerModel(model_name, quantization, config)
+        backend = _DEFAULT_BACKEND
+        for prefix, module_name, class_name in _BACKENDS:
+            if model_name.startswith(prefix):
+                backend = (module_name, class_name)
+                break
+        
+        return _load_backend(*backend)(model_name, quantization, config)
     
     def __init__(self, model_name: str, quantization: Optional[str] = None, config: Optional[Config] = None):
         """
@@ -63,7 +84,8 @@ class EmbeddingModel:
               texts: List[str], 
               batch_size: int = 32, 
               show_progress_bar: bool = False,
-              normalize_embeddings: bool = True) -> List[List[float]]:
+              normalize_embeddings: bool = True,
+              return_numpy: bool = False) -> Union[List[List[float]], "np.ndarray"]:
         """
         Encode texts into embeddings
         
@@ -72,9 +94,11 @@ class EmbeddingModel:
             batch_size: Batch size for encoding
             show_progress_bar: Whether to show a progress bar
             normalize_embeddings: Whether to normalize embeddings
+            return_numpy: Return the (len(texts), dimension) array as-is instead
+                of converting every value to a Python float
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, or a numpy array if return_numpy is set
         """
         raise NotImplementedError("Subclasses must implement encode()")
     
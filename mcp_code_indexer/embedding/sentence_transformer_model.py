@@ -6,9 +6,11 @@ import logging
 from typing import List, Dict, Any, Optional, Union
 import os
 import time
+import threading
 
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import torch
 
 from ..config import Config
 from . import EmbeddingModel
@@ -31,17 +33,61 @@ class SentenceTransformerModel(EmbeddingModel):
         """
         super().__init__(model_name, quantization, config)
         self.cache_dir = None
+        self.fp16 = True
+        preload = True
         
         if config:
             self.cache_dir = config.get("indexer.model_cache_dir", None)
+            self.fp16 = config.get("indexer.fp16", True)
+            preload = config.get("indexer.preload_model", True)
         
-        # Lazy loading - model will be loaded on first use
+        # Serializes model loading so concurrent callers never load twice
+        self._model_lock = threading.Lock()
+        
+        # Start loading the model in the background so the download and
+        # deserialization overlap with application startup instead of
+        # blocking the first encode() call
+        if preload:
+            threading.Thread(
+                target=self._preload_model,
+                name="embedding-model-load",
+                daemon=True
+            ).start()
+    
+    def _preload_model(self) -> None:
+        """
+        Load the model on the background thread
+        
+        Returns:
+            None
+        """
+        try:
+            self._ensure_model()
+        except Exception:
+            # Already logged by _load_model; _ensure_model retries on the
+            # caller's thread so the error surfaces there
+            pass
+    
+    def _ensure_model(self) -> None:
+        """
+        Make sure the model is loaded, waiting for the background load if running
+        
+        Returns:
+            None
+        """
+        # _load_model assigns the dimension last, so a non-None dimension
+        # means the model is fully prepared (fp16/quantization applied)
+        if self.dimension is None:
+            with self._model_lock:
+                if self.dimension is None:
+                    self._load_model()
     
     def encode(self, 
               texts: List[str], 
               batch_size: int = 32, 
               show_progress_bar: bool = False,
-              normalize_embeddings: bool = True) -> List[List[float]]:
+              normalize_embeddings: bool = True,
+              return_numpy: bool = False) -> Union[List[List[float]], "np.ndarray"]:
         """
         Encode texts into embeddings
         
@@ -50,12 +96,14 @@ class SentenceTransformerModel(EmbeddingModel):
             batch_size: Batch size for encoding
             show_progress_bar: Whether to show a progress bar
             normalize_embeddings: Whether to normalize embeddings
+            return_numpy: Return the (len(texts), dimension) array as-is instead
+                of converting every value to a Python float
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, or a numpy array if return_numpy is set
         """
-        if self.model is None:
-            self._load_model()
+        if self.dimension is None:
+            self._ensure_model()
         
         try:
             # Measure encoding time for performance monitoring
@@ -73,12 +121,16 @@ class SentenceTransformerModel(EmbeddingModel):
             encoding_time = time.time() - start_time
             logger.debug(f"Encoded {len(texts)} texts in {encoding_time:.2f}s ({len(texts)/encoding_time:.2f} texts/s)")
             
+            if return_numpy:
+                return embeddings
+            
             # Convert to list for serialization
             return embeddings.tolist()
         except Exception as e:
             logger.error(f"Error encoding texts: {str(e)}")
-            # Return zero embeddings as fallback
-            return [[0.0] * self.get_dimension()] * len(texts)
+            # Return zero embeddings as fallback, one independent row per text
+            zeros = np.zeros((len(texts), self.get_dimension()), dtype=np.float32)
+            return zeros if return_numpy else zeros.tolist()
     
     def get_dimension(self) -> int:
         """
@@ -87,12 +139,14 @@ class SentenceTransformerModel(EmbeddingModel):
         Returns:
             Embedding dimension
         """
-        if self.dimension is None:
-            if self.model is None:
-                self._load_model()
-            self.dimension = self.model.get_sentence_embedding_dimension()
+        # _load_model sets the dimension, so after the first call this is a
+        # single attribute read
+        dimension = self.dimension
+        if dimension is None:
+            self._ensure_model()
+            dimension = self.dimension
         
-        return self.dimension
+        return dimension
     
     def _load_model(self) -> None:
         """
@@ -104,12 +158,24 @@ class SentenceTransformerModel(EmbeddingModel):
         try:
             logger.info(f"Loading SentenceTransformer model: {self.model_name}")
             
+            kwargs = {}
+            
             # Load model with cache directory if specified
             if self.cache_dir:
                 os.makedirs(self.cache_dir, exist_ok=True)
-                self.model = SentenceTransformer(self.model_name, cache_folder=self.cache_dir)
-            else:
-                self.model = SentenceTransformer(self.model_name)
+                kwargs["cache_folder"] = self.cache_dir
+            
+            use_cuda = torch.cuda.is_available()
+            if use_cuda:
+                kwargs["device"] = "cuda"
+            
+            self.model = SentenceTransformer(self.model_name, **kwargs)
+            
+            # Run unquantized models in half precision on the GPU; encoders
+            # lose no meaningful retrieval quality and throughput roughly doubles
+            if use_cuda and self.fp16 and not self.quantization:
+                self.model.half()
+                logger.info("Using fp16 inference on CUDA")
             
             # Apply quantization if specified
             if self.quantization:
@@ -138,21 +204,13 @@ class SentenceTransformerModel(EmbeddingModel):
                 logger.warning("Model does not have modules attribute, skipping quantization")
                 return
             
-            # Apply dynamic quantization to all linear layers
-            for name, module in self.model.named_modules():
-                if isinstance(module, torch.nn.Linear):
-                    module_to_quantize = module
-                    quantized_module = torch.quantization.quantize_dynamic(
-                        module_to_quantize, 
-                        {torch.nn.Linear}, 
-                        dtype=torch.qint8
-                    )
-                    # Replace the original module with the quantized one
-                    parent_name = name.rsplit('.', 1)[0] if '.' in name else ''
-                    if parent_name:
-                        parent = self.model.get_submodule(parent_name)
-                        child_name = name.rsplit('.', 1)[1]
-                        setattr(parent, child_name, quantized_module)
+            # Apply dynamic quantization to all linear layers in a single pass;
+            # PyTorch walks the module tree and swaps each Linear itself
+            self.model = torch.quantization.quantize_dynamic(
+                self.model,
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
             
             logger.info("Applied int8 quantization to the model")
         except Exception as e:
@@ -180,20 +238,22 @@ class SentenceTransformerModel(EmbeddingModel):
                 logger.warning("Model does not have modules attribute, skipping quantization")
                 return
             
-            # Apply 4-bit quantization to all linear layers
-            for name, module in self.model.named_modules():
-                if isinstance(module, torch.nn.Linear) and not name.endswith('out_proj'):
-                    parent_name = name.rsplit('.', 1)[0] if '.' in name else ''
-                    if parent_name:
+            # Apply 4-bit quantization to all linear layers. The module list is
+            # snapshotted because layers are replaced while walking it
+            with torch.no_grad():
+                for name, module in list(self.model.named_modules()):
+                    if isinstance(module, torch.nn.Linear) and not name.endswith('out_proj') and '.' in name:
+                        parent_name, child_name = name.rsplit('.', 1)
                         parent = self.model.get_submodule(parent_name)
-                        child_name = name.rsplit('.', 1)[1]
                         
-                        # Create 4-bit quantized layer
+                        # Create 4-bit quantized layer on the meta device; its
+                        # parameters are replaced below, so no storage is allocated
                         quantized_module = bnb.nn.Linear4bit(
                             module.in_features,
                             module.out_features,
                             bias=module.bias is not None,
-                            compute_dtype=torch.float16
+                            compute_dtype=torch.float16,
+                            device="meta"
                         )
                         
                         # Copy weights (with appropriate conversion)
@@ -1,3 +1,4 @@
+import asyncio
 import queue
 from typing import Dict, List, Union
 
@@ -19,7 +20,14 @@ class Environment:
 
     def __init__(self, roles: List = [], **kwargs):
         self.remote = kwargs.get('remote', True)
+        # event loop owning asyncio queues, when roles run as coroutines
+        self.loop = kwargs.get('loop')
+        # keep at most this many history messages, None to keep everything
+        self.max_history = kwargs.get('max_history')
+        # request command -> role handling it, for broadcast messages
+        self.command_routes: Dict[str, str] = {}
         self.register_roles(roles)
+        self.register_command_routes(kwargs.get('command_routes', {}))
 
     def register_roles(self, roles: List[str]):
         roles_set = set(self.roles)
@@ -30,13 +38,45 @@ class Environment:
             if not isinstance(role, str):
                 raise ValueError(
                     f'The type of role should be str, but get {type(role)}')
-            if self.remote:
-                from ray.util.queue import Queue
+            if self.loop is not None:
+                self.messages_queue_map[role] = self._new_async_queue()
             else:
-                from queue import Queue
-            self.messages_queue_map[role] = Queue()
+                if self.remote:
+                    from ray.util.queue import Queue
+                else:
+                    from queue import Queue
+                self.messages_queue_map[role] = Queue()
             self.messages_list_map[role] = []
 
+    def register_command_routes(self, routes: Dict[str, str]):
+        """
+        Route broadcast "<command>: <argument>" messages straight to the role
+        handling the command instead of to every role
+        Args:
+            routes: command to role mapping
+
+        Returns:
+
+        """
+        for role in routes.values():
+            self._check_role_in_env(role)
+        self.command_routes.update(routes)
+
+    def _route(self, content: str):
+        # classify the message by its command prefix in a single dict lookup
+        command, sep, _ = content.partition(':')
+        if not sep:
+            return None
+        return self.command_routes.get(command.strip())
+
+    def _new_async_queue(self):
+        # create the queue on the owning loop so it binds to it on any
+        # python version
+        async def create():
+            return asyncio.Queue()
+
+        return asyncio.run_coroutine_threadsafe(create(), self.loop).result()
+
     def get_message_list(self, role: str):
         return self.messages_list_map[role]
 
@@ -56,22 +96,45 @@ class Environment:
         if isinstance(recipients, str):
             recipients = [recipients]
         if DEFAULT_SEND_TO in recipients:
-            recipients = self.roles
+            target = self._route(message.content) if isinstance(
+                message.content, str) else None
+            recipients = [target] if target else self.roles
 
         # add the message to system
         if role == USER_REQUIREMENT:
             self.user_requirement_list.append(message)
         self.message_history.append(message)
         for recipient in recipients:
-            if role != recipient:
-                logger.info(
-                    f'{role} send message: {message.content} to {recipient}')
+            # replies to the user have no queue, they only go to history
+            if role != recipient and recipient in self.messages_queue_map:
+                # per-message logs are debug only and formatted lazily
+                logger.debug('%s send message: %s to %s', role,
+                             message.content, recipient)
                 message = Message(
                     content=message.content,
                     send_to=recipient,
-                    sent_from=message.sent_from)
-                self.messages_queue_map[recipient].put(message)
+                    sent_from=message.sent_from,
+                    request_id=message.request_id)
+                if self.loop is not None:
+                    self.loop.call_soon_threadsafe(
+                        self.messages_queue_map[recipient].put_nowait,
+                        message)
+                else:
+                    self.messages_queue_map[recipient].put(message)
                 self.messages_list_map[recipient].append(message)
+        if self.max_history and len(
+                self.message_history) > 2 * self.max_history:
+            self._trim_history()
+
+    def _trim_history(self):
+        # trim in batches so appends stay amortized o(1)
+        limit = self.max_history
+        del self.message_history[:-limit]
+        del self.user_requirement_list[:-limit]
+        for role_messages in self.messages_list_map.values():
+            del role_messages[:-limit]
+        self.raw_history = ''.join(f'{message.sent_from}: {message.content}/n'
+                                   for message in self.message_history)
 
     def extract_message_by_role(self, role: str):
         """
@@ -91,16 +154,36 @@ class Environment:
             else:
                 try:
                     item = self.messages_queue_map[role].get_nowait()
-                except queue.Empty:
+                except (queue.Empty, asyncio.QueueEmpty):
                     break
 
             # deduplicate message from user requirement and message queue
             if item not in messages_to_role:
                 messages_to_role.append(item)
-        logger.info(f'{role} extract data: {messages_to_role}')
+        logger.debug('%s extract data: %s', role, messages_to_role)
 
         return messages_to_role
 
+    async def await_message_by_role(self, role: str):
+        """
+        wait until a message arrives for the role, then drain everything
+        already queued so the batch is handled in one pass; for environments
+        created with an event loop, must run on that loop
+        Args:
+            role: the role
+
+        Returns:
+            the messages
+        """
+        self._check_role_in_env(role)
+        role_queue = self.messages_queue_map[role]
+        messages = [await role_queue.get()]
+        while not role_queue.empty():
+            messages.append(role_queue.get_nowait())
+        logger.debug('%s extract data: %s', role, messages)
+
+        return messages
+
     def extract_all_history_message(self, limit: int = 20):
         if limit and limit > 0:
             return self.message_history[-limit:]
@@ -126,11 +209,28 @@ class Environment:
             )
 
     def reset_env_queues(self):
-        for role in self.messages_queue_map.keys():
-            if self.remote:
-                from ray.util.queue import Queue
+        # drain the queues in place, roles may be blocked on them in
+        # await_message_by_role
+        if self.loop is not None:
+            Empty = asyncio.QueueEmpty
+        elif self.remote:
+            from ray.util.queue import Empty
+        else:
+            from queue import Empty
+        for role, role_queue in self.messages_queue_map.items():
+            if self.loop is not None:
+                # asyncio queues may only be touched from their loop
+                self.loop.call_soon_threadsafe(self._drain_queue,
+                                               role_queue, Empty)
             else:
-                from queue import Queue
-            self.messages_queue_map[role] = Queue()
+                self._drain_queue(role_queue, Empty)
             self.messages_list_map[role] = []
         self.message_history = []
+
+    @staticmethod
+    def _drain_queue(role_queue, empty):
+        while not role_queue.empty():
+            try:
+                role_queue.get_nowait()
+            except empty:
+                break
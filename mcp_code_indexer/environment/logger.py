@@ -59,9 +59,3 @@ def debug(msg, *args, **kwargs):
         **kwargs: Additional keyword arguments.
     """
     agent_logger.debug(msg, *args, **kwargs)
-
-# Add the methods to the logger instance
-agent_logger.info = info
-agent_logger.error = error
-agent_logger.warning = warning
-agent_logger.debug = debug
\ No newline at end of file
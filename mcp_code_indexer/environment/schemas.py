@@ -4,6 +4,24 @@ Schema definitions for the MCP Code Indexer environment.
 This module provides schema classes that were previously imported from modelscope_agent.
 """
 
+import itertools
+import uuid
+
+# Request ids are a per-process random prefix plus a counter, so creating
+# one does not read from the OS random source on every message
+_ID_PREFIX = uuid.uuid4().hex[:16]
+_id_counter = itertools.count(1)
+
+
+def new_request_id():
+    """Create a request id unique across processes.
+    
+    Returns:
+        str: The request id.
+    """
+    return f"{_ID_PREFIX}{next(_id_counter):x}"
+
+
 class Message:
     """Message class for communication between components.
     
@@ -11,17 +29,20 @@ class Message:
     in the environment.
     """
     
-    def __init__(self, content="", send_to="all", sent_from="system"):
+    def __init__(self, content="", send_to="all", sent_from="system", request_id=None):
         """Initialize a new Message.
         
         Args:
             content (str): The content of the message.
             send_to (str): The recipient of the message.
             sent_from (str): The sender of the message.
+            request_id (str): Correlation id shared by a request and its replies,
+                generated when not given.
         """
         self.content = content
         self.send_to = send_to
         self.sent_from = sent_from
+        self.request_id = request_id or new_request_id()
         
     def __eq__(self, other):
         """Check if two messages are equal.
@@ -36,7 +57,8 @@ class Message:
             return False
         return (self.content == other.content and 
                 self.send_to == other.send_to and 
-                self.sent_from == other.sent_from)
+                self.sent_from == other.sent_from and
+                self.request_id == other.request_id)
                 
     def __repr__(self):
         """Get a string representation of the message.
@@ -44,4 +66,4 @@ class Message:
         Returns:
             str: A string representation of the message.
         """
-        return f"Message(content='{self.content}', send_to='{self.send_to}', sent_from='{self.sent_from}')"
\ No newline at end of file
+        return f"Message(content='{self.content}', send_to='{self.send_to}', sent_from='{self.sent_from}', request_id='{self.request_id}')"
\ No newline at end of file
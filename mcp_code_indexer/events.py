@@ -3,14 +3,28 @@ Event system module
 Provides a simple event system for asynchronous component communication
 """
 
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, Any, Callable, Optional, Set, Tuple
 import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Worker threads for asynchronous event delivery, created on first use
+_dispatch_pool: Optional[ThreadPoolExecutor] = None
+_dispatch_pool_lock = threading.Lock()
+
+def _get_dispatch_pool() -> ThreadPoolExecutor:
+    """Get the shared pool that delivers asynchronously published events"""
+    global _dispatch_pool
+    if _dispatch_pool is None:
+        with _dispatch_pool_lock:
+            if _dispatch_pool is None:
+                _dispatch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="event")
+    return _dispatch_pool
+
 class EventType(Enum):
     """Event types for system-wide events"""
     # Indexing events
@@ -18,6 +32,7 @@ class EventType(Enum):
     INDEXING_PROGRESS = "indexing_progress"
     INDEXING_COMPLETED = "indexing_completed"
     INDEXING_FAILED = "indexing_failed"
+    INDEX_DELETED = "index_deleted"
     
     # Search events
     SEARCH_STARTED = "search_started"
@@ -36,6 +51,8 @@ class EventType(Enum):
 class Event:
     """Event class for the event system"""
     
+    __slots__ = ("event_type", "data", "source", "timestamp")
+    
     def __init__(self, event_type: EventType, data: Dict[str, Any] = None, source: str = None):
         """
         Initialize an event
@@ -73,7 +90,12 @@ class EventBus:
         if self._initialized:
             return
             
-        self._subscribers: Dict[EventType, List[Callable[[Event], None]]] = {}
+        # Subscriber tuples are replaced rather than mutated, so publishers can
+        # iterate a snapshot without locking while others (un)subscribe
+        self._subscribers: Dict[EventType, Tuple[Callable[[Event], None], ...]] = {}
+        # Reverse index of the event types each callback is subscribed to
+        self._subscriptions: Dict[Callable[[Event], None], Set[EventType]] = {}
+        self._subscribers_lock = threading.Lock()
         self._initialized = True
         logger.info("Event bus initialized")
     
@@ -85,12 +107,13 @@ class EventBus:
             event_type: Type of event to subscribe to
             callback: Callback function to be called when the event occurs
         """
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        
-        if callback not in self._subscribers[event_type]:
-            self._subscribers[event_type].append(callback)
-            logger.debug(f"Subscribed to {event_type.value}")
+        with self._subscribers_lock:
+            callbacks = self._subscribers.get(event_type, ())
+            if callback in callbacks:
+                return
+            self._subscribers[event_type] = callbacks + (callback,)
+            self._subscriptions.setdefault(callback, set()).add(event_type)
+        logger.debug(f"Subscribed to {event_type.value}")
     
     def unsubscribe(self, event_type: EventType, callback: Callable[[Event], None]) -> None:
         """
@@ -100,9 +123,45 @@ class EventBus:
             event_type: Type of event to unsubscribe from
             callback: Callback function to remove
         """
-        if event_type in self._subscribers and callback in self._subscribers[event_type]:
-            self._subscribers[event_type].remove(callback)
-            logger.debug(f"Unsubscribed from {event_type.value}")
+        with self._subscribers_lock:
+            callbacks = self._subscribers.get(event_type, ())
+            if callback not in callbacks:
+                return
+            self._subscribers[event_type] = tuple(cb for cb in callbacks if cb != callback)
+            event_types = self._subscriptions.get(callback)
+            if event_types is not None:
+                event_types.discard(event_type)
+                if not event_types:
+                    del self._subscriptions[callback]
+        logger.debug(f"Unsubscribed from {event_type.value}")
+    
+    def unsubscribe_all(self, callback: Callable[[Event], None]) -> None:
+        """
+        Unsubscribe a callback from every event type it is subscribed to
+        
+        Args:
+            callback: Callback function to remove
+        """
+        with self._subscribers_lock:
+            for event_type in self._subscriptions.pop(callback, ()):
+                self._subscribers[event_type] = tuple(
+                    cb for cb in self._subscribers[event_type] if cb != callback
+                )
+        logger.debug("Unsubscribed callback from all events")
+    
+    def has_subscribers(self, event_type: EventType) -> bool:
+        """
+        Check whether an event type has any subscribers
+        
+        Lets publishers skip building events nobody will receive
+        
+        Args:
+            event_type: Type of event
+            
+        Returns:
+            True if at least one callback is subscribed
+        """
+        return bool(self._subscribers.get(event_type))
     
     def publish(self, event: Event) -> None:
         """
@@ -111,14 +170,12 @@ class EventBus:
         Args:
             event: Event to publish
         """
-        if event.event_type not in self._subscribers:
+        callbacks = self._subscribers.get(event.event_type)
+        if not callbacks:
             return
             
-        for callback in self._subscribers[event.event_type]:
-            try:
-                callback(event)
-            except Exception as e:
-                logger.error(f"Error in event callback: {str(e)}")
+        for callback in callbacks:
+            self._invoke(callback, event)
         
         logger.debug(f"Published event: {event}")
     
@@ -126,10 +183,35 @@ class EventBus:
         """
         Publish an event asynchronously
         
+        Each subscriber is called concurrently, so a slow subscriber does not
+        delay delivery to the others
+        
         Args:
             event: Event to publish
         """
-        threading.Thread(target=self.publish, args=(event,), daemon=True).start()
+        callbacks = self._subscribers.get(event.event_type)
+        if not callbacks:
+            return
+        
+        pool = _get_dispatch_pool()
+        for callback in callbacks:
+            pool.submit(self._invoke, callback, event)
+        
+        logger.debug(f"Published event asynchronously: {event}")
+    
+    @staticmethod
+    def _invoke(callback: Callable[[Event], None], event: Event) -> None:
+        """
+        Call a subscriber, logging any error it raises
+        
+        Args:
+            callback: Subscriber callback
+            event: Event to deliver
+        """
+        try:
+            callback(event)
+        except Exception as e:
+            logger.error(f"Error in event callback: {str(e)}")
 
 # Convenience functions for working with the event bus
 def subscribe(event_type: EventType, callback: Callable[[Event], None]) -> None:
@@ -152,6 +234,27 @@ def unsubscribe(event_type: EventType, callback: Callable[[Event], None]) -> Non
     """
     EventBus().unsubscribe(event_type, callback)
 
+def unsubscribe_all(callback: Callable[[Event], None]) -> None:
+    """
+    Unsubscribe a callback from every event type it is subscribed to
+    
+    Args:
+        callback: Callback function to remove
+    """
+    EventBus().unsubscribe_all(callback)
+
+def has_subscribers(event_type: EventType) -> bool:
+    """
+    Check whether an event type has any subscribers
+    
+    Args:
+        event_type: Type of event
+        
+    Returns:
+        True if at least one callback is subscribed
+    """
+    return EventBus().has_subscribers(event_type)
+
 def publish(event: Event) -> None:
     """
     Publish an event
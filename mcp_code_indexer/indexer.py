@@ -12,7 +12,14 @@ import logging
 import json
 from datetime import datetime
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+
+# 文件锁仅在POSIX系统可用，其他平台只依赖进程内的indexing_lock
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from sentence_transformers import SentenceTransformer
 import chromadb
@@ -23,6 +30,8 @@ from .project_identity import ProjectIdentifier
 from .code_optimizer import CodeOptimizer
 from .code_compressor import CodeCompressor, NormalizationLevel
 from .context_manager import ContextManager, ContextType, ContextPriority
+from .events import EventType, Event, publish
+from .utils.json_utils import fast_dumps, fast_loads
 
 # 配置默认的优化选项
 DEFAULT_OPTIMIZATION_OPTIONS = {
@@ -41,9 +50,85 @@ class IndexingStatus:
     FAILED = "failed"
     UPDATING = "updating"
 
+class _QueryEmbeddingBatcher:
+    """
+    查询嵌入微批处理器
+    
+    将短时间窗口内到达的多个查询合并为一次模型前向计算，
+    相同的查询在同一批次内只编码一次
+    """
+    
+    def __init__(self, encode_fn: Callable[[List[str]], List[List[float]]],
+                 batch_size: int = 32, max_wait: float = 0.005):
+        """
+        初始化批处理器
+        
+        Args:
+            encode_fn: 批量编码函数，输入查询列表，返回嵌入列表
+            batch_size: 单批次最大查询数
+            max_wait: 等待凑批的最长时间（秒）
+            
+        Returns:
+            无返回值
+        """
+        self.encode_fn = encode_fn
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="query-embedding-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, query: str) -> Future:
+        """
+        提交查询
+        
+        Args:
+            query: 查询字符串
+            
+        Returns:
+            完成后结果为查询嵌入的Future
+        """
+        future = Future()
+        self._queue.put((query, future))
+        return future
+    
+    def _run(self) -> None:
+        """
+        后台线程：收集批次并统一编码
+        
+        Returns:
+            无返回值
+        """
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # 去重后统一编码
+            queries = list(dict.fromkeys(query for query, _ in batch))
+            try:
+                embeddings = dict(zip(queries, self.encode_fn(queries)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for query, future in batch:
+                future.set_result(embeddings[query])
+
 class CodeChunk:
     """代码块类，表示一个代码片段"""
     
+    # 每次索引和搜索都会创建大量实例，使用槽位省去实例字典
+    __slots__ = ("content", "file_path", "start_line", "end_line", "language", "type")
+    
     def __init__(self, content: str, file_path: str, start_line: int, end_line: int, 
                  language: str, type: str = "code"):
         """
@@ -181,6 +266,9 @@ class CodeIndexer:
         # 初始化嵌入模型
         self.embedding_model_name = config.get("indexer.embedding_model")
         self.embedding_model = None  # 延迟加载
+        self._embedding_model_lock = threading.Lock()
+        self._query_batcher = None  # 查询嵌入批处理器，首次搜索时创建
+        self._query_batcher_lock = threading.Lock()
         
         # 初始化优化器和管理器
         self.optimizer = CodeOptimizer()
@@ -193,6 +281,15 @@ class CodeIndexer:
         # 索引状态
         self.indexing_status = {}
         self.indexing_lock = threading.Lock()
+        self._status_mtime_ns = None  # 最近一次加载或保存的状态文件修改时间
+        
+        # 索引任务由固定数量的工作线程从有界队列中取出执行，限制同时运行的索引数；
+        # 队列满时提交方阻塞等待，形成背压，而不是无限创建线程
+        self._index_jobs = queue.Queue(maxsize=self.config.get("indexer.max_queued_jobs", 64))
+        self._index_workers: List[threading.Thread] = []
+        self._index_workers_lock = threading.Lock()
+        # 已提交但尚未结束的索引任务对应的项目ID，用于合并重复提交
+        self._active_jobs: Set[str] = set()
         
         # 从磁盘加载索引状态
         self._load_indexing_status()
@@ -207,8 +304,49 @@ class CodeIndexer:
         Returns:
             无返回值
         """
+        # 多项目搜索并发调用，加锁避免同一模型被重复加载
         if self.embedding_model is None:
-            self.embedding_model = SentenceTransformer(self.embedding_model_name)
+            with self._embedding_model_lock:
+                if self.embedding_model is None:
+                    self.embedding_model = SentenceTransformer(self.embedding_model_name)
+    
+    def _encode_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        批量生成查询嵌入
+        
+        Args:
+            queries: 查询字符串列表
+            
+        Returns:
+            查询嵌入列表
+        """
+        return self.embedding_model.encode(
+            queries,
+            show_progress_bar=False,
+            convert_to_tensor=False,
+            normalize_embeddings=True
+        ).tolist()
+    
+    def _embed_query(self, query: str, timeout: Optional[float] = None) -> List[float]:
+        """
+        生成单个查询嵌入，并发查询经批处理器合并编码
+        
+        Args:
+            query: 查询字符串
+            timeout: 等待超时时间（秒）
+            
+        Returns:
+            查询嵌入
+        """
+        if self._query_batcher is None:
+            with self._query_batcher_lock:
+                if self._query_batcher is None:
+                    self._query_batcher = _QueryEmbeddingBatcher(
+                        self._encode_queries,
+                        batch_size=self.config.get("indexer.query_batch_size", 32),
+                        max_wait=self.config.get("indexer.query_batch_wait_ms", 5) / 1000.0
+                    )
+        return self._query_batcher.submit(query).result(timeout=timeout)
     
     def index_project(self, project_path: str,
                      progress_callback: Optional[Callable[[str, float], None]] = None,
@@ -234,6 +372,10 @@ class CodeIndexer:
         
         # 检查是否已在索引中
         with self.indexing_lock:
+            # 同一项目已有排队或运行中的任务时直接复用，不重复提交
+            if project_id in self._active_jobs:
+                return project_id
+            
             if project_id in self.indexing_status:
                 status = self.indexing_status[project_id]
                 if status == IndexingStatus.INDEXING or status == IndexingStatus.UPDATING:
@@ -242,14 +384,12 @@ class CodeIndexer:
             # 设置索引状态并保存
             status = IndexingStatus.NEW if is_new else IndexingStatus.UPDATING
             self.indexing_status[project_id] = status
-            self._save_indexing_status()
+            self._save_indexing_status(project_id)
+            self._active_jobs.add(project_id)
         
-        # 启动索引线程
-        threading.Thread(
-            target=self._index_project_thread,
-            args=(project_id, project_path, progress_callback),
-            daemon=True
-        ).start()
+        # 提交索引任务，排队期间状态保持为NEW/UPDATING
+        self._start_index_workers()
+        self._index_jobs.put((project_id, project_path, progress_callback))
         
         return project_id
 
@@ -304,10 +444,43 @@ class CodeIndexer:
         except:
             return False
     
-    def _index_project_thread(self, project_id: str, project_path: str,
-                              progress_callback: Optional[Callable[[str, float], None]]) -> None:
+    def _start_index_workers(self) -> None:
+        """
+        首次提交索引任务时启动索引工作线程
+        
+        Returns:
+            无返回值
+        """
+        if self._index_workers:
+            return
+        with self._index_workers_lock:
+            if self._index_workers:
+                return
+            for i in range(self.config.get("indexer.max_concurrent_jobs", 2)):
+                worker = threading.Thread(target=self._index_worker, name=f"index-worker-{i}", daemon=True)
+                worker.start()
+                self._index_workers.append(worker)
+    
+    def _index_worker(self) -> None:
+        """
+        索引工作线程，依次执行队列中的索引任务
+        
+        Returns:
+            无返回值
+        """
+        while True:
+            project_id, project_path, progress_callback = self._index_jobs.get()
+            try:
+                self._run_indexing(project_id, project_path, progress_callback)
+            finally:
+                with self.indexing_lock:
+                    self._active_jobs.discard(project_id)
+                self._index_jobs.task_done()
+    
+    def _run_indexing(self, project_id: str, project_path: str,
+                      progress_callback: Optional[Callable[[str, float], None]]) -> None:
         """
-        索引项目线程
+        执行项目索引
         
         Args:
             project_id: 项目ID
@@ -321,7 +494,7 @@ class CodeIndexer:
             # 更新状态并保存
             with self.indexing_lock:
                 self.indexing_status[project_id] = IndexingStatus.INDEXING
-                self._save_indexing_status()
+                self._save_indexing_status(project_id)
             
             if progress_callback:
                 progress_callback(IndexingStatus.INDEXING, 0.0)
@@ -384,7 +557,7 @@ class CodeIndexer:
                                         "language": chunk.language,
                                         "type": chunk.type,
                                         "project_id": project_id,
-                                        "chunk_data": json.dumps(chunk.to_dict())
+                                        "chunk_data": fast_dumps(chunk.to_dict())
                                     })
                                 
                                 # 当达到批处理大小时，生成嵌入并添加到数据库
@@ -445,19 +618,38 @@ class CodeIndexer:
             # 更新状态并保存
             with self.indexing_lock:
                 self.indexing_status[project_id] = IndexingStatus.COMPLETED
-                self._save_indexing_status()
+                self._save_indexing_status(project_id)
             
             if progress_callback:
                 progress_callback(IndexingStatus.COMPLETED, 1.0)
             
+            # 索引内容已变化，丢弃该项目的查询缓存后再通知
+            self.invalidate_query_cache(project_id)
+            
+            # 通知索引完成
+            publish(Event(
+                EventType.INDEXING_COMPLETED,
+                {"project_id": project_id, "project_path": project_path},
+                "indexer"
+            ))
+            
         except:
             # 更新状态并保存
             with self.indexing_lock:
                 self.indexing_status[project_id] = IndexingStatus.FAILED
-                self._save_indexing_status()
+                self._save_indexing_status(project_id)
             
             if progress_callback:
                 progress_callback(IndexingStatus.FAILED, 0.0)
+            
+            self.invalidate_query_cache(project_id)
+            
+            # 通知索引失败
+            publish(Event(
+                EventType.INDEXING_FAILED,
+                {"project_id": project_id, "project_path": project_path},
+                "indexer"
+            ))
     
     def _scan_project_files(self, project_path: str) -> List[str]:
         """
@@ -749,6 +941,7 @@ class CodeIndexer:
         try:
             status_file = self.status_path / "status.json"
             if status_file.exists():
+                self._status_mtime_ns = status_file.stat().st_mtime_ns
                 with open(status_file, 'r', encoding='utf-8') as f:
                     self.indexing_status = json.load(f)
                 logging.info(f"从磁盘加载了 {len(self.indexing_status)} 个项目的索引状态")
@@ -756,21 +949,85 @@ class CodeIndexer:
             logging.error(f"加载索引状态失败: {str(e)}")
             self.indexing_status = {}
     
-    def _save_indexing_status(self) -> None:
+    def _save_indexing_status(self, project_id: str) -> None:
         """
-        将索引状态保存到磁盘
+        将指定项目的索引状态写入磁盘，调用方需持有indexing_lock
         
+        多个服务进程共享同一个状态文件，写入前在文件锁内重新读取磁盘上的状态，
+        只合并本项目的变更（项目不在内存状态中时从文件删除），避免覆盖其他进程的记录
+        
+        Args:
+            project_id: 状态发生变化的项目ID
+            
         Returns:
             无返回值
         """
         try:
             status_file = self.status_path / "status.json"
-            with open(status_file, 'w', encoding='utf-8') as f:
-                json.dump(self.indexing_status, f, indent=2)
-            logging.info(f"保存了 {len(self.indexing_status)} 个项目的索引状态到磁盘")
+            with open(self.status_path / "status.lock", 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    merged = self._read_status_file(status_file)
+                    if project_id in self.indexing_status:
+                        merged[project_id] = self.indexing_status[project_id]
+                    else:
+                        merged.pop(project_id, None)
+                    
+                    # 先写临时文件再原子替换，其他进程不会读到写了一半的文件
+                    tmp_file = status_file.with_suffix(f".{os.getpid()}.tmp")
+                    with open(tmp_file, 'w', encoding='utf-8') as f:
+                        json.dump(merged, f, indent=2)
+                    os.replace(tmp_file, status_file)
+                    self._status_mtime_ns = status_file.stat().st_mtime_ns
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+            
+            self.indexing_status = merged
+            logging.info(f"保存了 {len(merged)} 个项目的索引状态到磁盘")
         except Exception as e:
             logging.error(f"保存索引状态失败: {str(e)}")
     
+    @staticmethod
+    def _read_status_file(status_file: Path) -> Dict[str, str]:
+        """
+        读取状态文件
+        
+        Args:
+            status_file: 状态文件路径
+            
+        Returns:
+            项目ID到索引状态的字典，文件不存在时返回空字典
+        """
+        try:
+            with open(status_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+    
+    def _refresh_indexing_status(self) -> None:
+        """
+        状态文件被其他进程更新时以磁盘上的索引状态替换内存状态，调用方需持有indexing_lock
+        
+        本进程的每次变更都会立即合并写入文件，因此文件内容即为最新的完整状态，
+        其他进程删除的项目也会同步移除
+        
+        Returns:
+            无返回值
+        """
+        status_file = self.status_path / "status.json"
+        try:
+            mtime_ns = status_file.stat().st_mtime_ns
+            if mtime_ns == self._status_mtime_ns:
+                return
+            self.indexing_status = self._read_status_file(status_file)
+            self._status_mtime_ns = mtime_ns
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"刷新索引状态失败: {str(e)}")
+    
     def get_indexing_status(self, project_id: str) -> Tuple[str, float]:
         """
         获取项目索引状态
@@ -782,6 +1039,8 @@ class CodeIndexer:
             元组(状态, 进度)
         """
         with self.indexing_lock:
+            # 多个服务进程共享状态文件，读取前同步其他进程的更新
+            self._refresh_indexing_status()
             status = self.indexing_status.get(project_id, IndexingStatus.NEW)
         
         # 如果已完成，进度为1.0，否则为0.0
@@ -797,7 +1056,7 @@ class CodeIndexer:
                 if collection.count() > 0:
                     with self.indexing_lock:
                         self.indexing_status[project_id] = IndexingStatus.COMPLETED
-                        self._save_indexing_status()
+                        self._save_indexing_status(project_id)
                     status = IndexingStatus.COMPLETED
                     progress = 1.0
             except Exception as e:
@@ -810,6 +1069,7 @@ class CodeIndexer:
     _cache_lock = threading.Lock()
     _cache_max_size = 100  # 最大缓存条目数
     _cache_ttl = 300  # 缓存有效期（秒）
+    _cache_generation = 0  # 每次失效加一，搜索期间发生失效时结果不写入缓存
     
     def search(self, project_id: str, query: str, limit: int = 10, timeout: int = 30) -> List[Dict[str, Any]]:
         """
@@ -832,11 +1092,12 @@ class CodeIndexer:
         
         # 检查缓存
         with self._cache_lock:
+            generation = CodeIndexer._cache_generation
             if cache_key in self._query_cache:
                 cache_entry = self._query_cache[cache_key]
                 # 检查缓存是否过期
                 if time.time() - cache_entry['timestamp'] < self._cache_ttl:
-                    logger.info(f"使用缓存结果: {cache_key}")
+                    logger.info("使用缓存结果: %s", cache_key)
                     return cache_entry['results']
         
         # 加载嵌入模型
@@ -862,13 +1123,11 @@ class CodeIndexer:
             
             # 生成查询嵌入
             try:
-                # 使用更高效的编码设置
-                query_embedding = self.embedding_model.encode(
+                # 并发查询合并为一次批量编码
+                query_embedding = self._embed_query(
                     query,
-                    show_progress_bar=False,
-                    convert_to_tensor=False,
-                    normalize_embeddings=True
-                ).tolist()
+                    timeout=max(0.0, timeout - (time.time() - start_time))
+                )
             except Exception as e:
                 logger.error(f"生成查询嵌入失败: {str(e)}")
                 return []
@@ -899,7 +1158,8 @@ class CodeIndexer:
             if results and results['metadatas']:
                 for i, metadata in enumerate(results['metadatas'][0]):
                     try:
-                        chunk_data = json.loads(metadata.get('chunk_data', '{}'))
+                        # 每条结果都要解析，可用时使用orjson
+                        chunk_data = fast_loads(metadata.get('chunk_data', '{}'))
                         chunk = CodeChunk.from_dict(chunk_data)
                         
                         # 添加相似度分数
@@ -913,16 +1173,17 @@ class CodeIndexer:
             
             # 更新缓存
             with self._cache_lock:
-                # 如果缓存已满，删除最旧的条目
-                if len(self._query_cache) >= self._cache_max_size:
-                    oldest_key = min(self._query_cache.keys(), key=lambda k: self._query_cache[k]['timestamp'])
-                    del self._query_cache[oldest_key]
-                
-                # 添加新的缓存条目
-                self._query_cache[cache_key] = {
-                    'results': code_chunks,
-                    'timestamp': time.time()
-                }
+                if generation == CodeIndexer._cache_generation:
+                    # 如果缓存已满，删除最旧的条目
+                    if len(self._query_cache) >= self._cache_max_size:
+                        oldest_key = min(self._query_cache.keys(), key=lambda k: self._query_cache[k]['timestamp'])
+                        del self._query_cache[oldest_key]
+                    
+                    # 添加新的缓存条目
+                    self._query_cache[cache_key] = {
+                        'results': code_chunks,
+                        'timestamp': time.time()
+                    }
             
             return code_chunks
             
@@ -930,6 +1191,22 @@ class CodeIndexer:
             logger.error(f"搜索失败: {str(e)}")
             return []
     
+    def invalidate_query_cache(self, project_id: str) -> None:
+        """
+        删除指定项目的查询缓存
+        
+        Args:
+            project_id: 项目ID
+            
+        Returns:
+            无返回值
+        """
+        prefix = f"{project_id}:"
+        with self._cache_lock:
+            CodeIndexer._cache_generation += 1
+            for cache_key in [key for key in self._query_cache if key.startswith(prefix)]:
+                del self._query_cache[cache_key]
+    
     def delete_project_index(self, project_id: str) -> bool:
         """
         删除项目索引
@@ -953,8 +1230,13 @@ class CodeIndexer:
             
             # 更新状态
             with self.indexing_lock:
-                if project_id in self.indexing_status:
-                    del self.indexing_status[project_id]
+                self.indexing_status.pop(project_id, None)
+                self._save_indexing_status(project_id)
+            
+            self.invalidate_query_cache(project_id)
+            
+            # 通知索引已删除，检索结果缓存随之失效
+            publish(Event(EventType.INDEX_DELETED, {"project_id": project_id}, "indexer"))
             
             return True
         except:
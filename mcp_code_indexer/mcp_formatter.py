@@ -5,7 +5,7 @@ MCP响应格式化模块
 
 import os
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 import logging
 from datetime import datetime
 
@@ -48,11 +48,7 @@ class McpFormatter(FormatterProtocol):
             return self._create_empty_response(query)
         
         # 格式化代码块
-        code_blocks = []
-        for result in results:
-            code_block = self._format_code_block(result, confidence_threshold)
-            if code_block:
-                code_blocks.append(code_block)
+        code_blocks = list(self.iter_code_blocks(results, confidence_threshold))
         
         # 创建MCP响应
         response = {
@@ -65,6 +61,23 @@ class McpFormatter(FormatterProtocol):
         
         return response
     
+    def iter_code_blocks(self, results: Iterable[Dict[str, Any]],
+                         confidence_threshold: float = 0.7) -> Iterator[Dict[str, Any]]:
+        """
+        逐个格式化搜索结果中的代码块，供流式响应使用
+        
+        Args:
+            results: 搜索结果
+            confidence_threshold: 置信度阈值，低于此值的结果将被标记为低置信度
+            
+        Returns:
+            格式化后的代码块迭代器，跳过无法格式化的结果
+        """
+        for result in results:
+            code_block = self._format_code_block(result, confidence_threshold)
+            if code_block:
+                yield code_block
+    
     def _format_code_block(self, result: Dict[str, Any], 
                           confidence_threshold: float) -> Optional[Dict[str, Any]]:
         """
@@ -4,15 +4,80 @@
 """
 
 import os
+import re
+import time
 import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 import json
 
 from .config import Config
 from .indexer import CodeIndexer
+from .events import EventType, Event, subscribe, unsubscribe_all
 
 logger = logging.getLogger(__name__)
 
+# 相似度计算使用的正则，在模块加载时编译一次
+_TYPE_DECL_RE = re.compile(r'\b(int|float|double|char|boolean|string|var|let|const|auto)\b\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+_TOKEN_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*|[0-9]+|[+\-*/=<>!&|^~%]+|[{}()\[\],.;:]')
+_IDENTIFIER_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+_CONTROL_PATTERNS = {
+    name: re.compile(r'\b' + name + r'\b')
+    for name in ('if', 'else', 'for', 'while', 'switch', 'case', 'try', 'catch', 'return')
+}
+
+@lru_cache(maxsize=256)
+def _read_file_lines(file_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """
+    读取文件所有行，按(路径, 修改时间)缓存，文件修改后自动失效
+    
+    Args:
+        file_path: 文件路径
+        mtime_ns: 文件修改时间（纳秒）
+        
+    Returns:
+        文件行元组
+    """
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        return tuple(f.readlines())
+
+@lru_cache(maxsize=1024)
+def _build_file_overview(file_path: str, mtime_ns: int, file_size: int) -> Dict[str, Any]:
+    """
+    生成文件概览，按(路径, 修改时间, 大小)缓存
+    
+    Args:
+        file_path: 文件路径
+        mtime_ns: 文件修改时间（纳秒）
+        file_size: 文件大小
+        
+    Returns:
+        文件概览字典
+    """
+    content = ''.join(_read_file_lines(file_path, mtime_ns))
+    
+    # 获取行数
+    lines = content.split('\n')
+    line_count = len(lines)
+    
+    # 获取文件扩展名
+    _, ext = os.path.splitext(file_path)
+    
+    # 提取文件头部（最多100行）
+    header = '\n'.join(lines[:min(100, line_count)])
+    
+    return {
+        'file_path': file_path,
+        'file_name': os.path.basename(file_path),
+        'file_size': file_size,
+        'line_count': line_count,
+        'extension': ext,
+        'header': header
+    }
+
 class SearchEngine:
     """
     检索引擎类
@@ -33,6 +98,27 @@ class SearchEngine:
         """
         self.config = config
         self.indexer = indexer
+        
+        # 搜索结果LRU缓存，键为(查询, 项目ID, 过滤条件, 数量限制)
+        self._result_cache: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._result_cache_size = config.get("search.cache_size", 256)
+        self._result_cache_lock = threading.Lock()
+        # 每次失效加一，搜索开始前读取，结果写回时若已变化则说明期间索引有更新，不再缓存
+        self._cache_generation = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # 多项目搜索共享的线程池
+        self._search_pool = ThreadPoolExecutor(
+            max_workers=config.get("search.max_workers", min(32, (os.cpu_count() or 1) * 4)),
+            thread_name_prefix="search"
+        )
+        
+        # 索引变化后缓存结果失效
+        subscribe(EventType.INDEXING_COMPLETED, self._invalidate_result_cache)
+        subscribe(EventType.INDEXING_FAILED, self._invalidate_result_cache)
+        subscribe(EventType.INDEX_DELETED, self._invalidate_result_cache)
+        
         logger.info("检索引擎初始化完成")
     
     def search(self, query: str, project_ids: Optional[List[str]] = None, 
@@ -49,7 +135,32 @@ class SearchEngine:
         Returns:
             代码块字典列表
         """
-        logger.info(f"搜索代码: {query}, 项目: {project_ids}, 过滤条件: {filters}")
+        logger.info("搜索代码: %s, 项目: %s, 过滤条件: %s", query, project_ids, filters)
+        
+        # 检查结果缓存
+        cache_key = None
+        generation = None
+        if self._result_cache_size > 0:
+            try:
+                cache_key = (
+                    query,
+                    tuple(project_ids) if project_ids else None,
+                    json.dumps(filters, sort_keys=True) if filters else None,
+                    limit
+                )
+            except (TypeError, ValueError):
+                # 过滤条件无法序列化为JSON时不使用缓存
+                cache_key = None
+        if cache_key is not None:
+            with self._result_cache_lock:
+                generation = self._cache_generation
+                cached = self._result_cache.get(cache_key)
+                if cached is not None:
+                    self._result_cache.move_to_end(cache_key)
+                    self.cache_hits += 1
+                    logger.debug("搜索缓存命中: %s (命中 %d, 未命中 %d)", query, self.cache_hits, self.cache_misses)
+                    return [dict(result) for result in cached]
+                self.cache_misses += 1
         
         # 如果未指定项目，获取所有已索引项目
         if not project_ids:
@@ -59,9 +170,7 @@ class SearchEngine:
         all_results = []
         
         # 对每个项目执行搜索
-        for project_id in project_ids:
-            results = self.indexer.search(project_id, query, limit=limit)
-            
+        for results in self._search_projects(project_ids, query, limit):
             # 应用过滤条件
             if filters:
                 results = self._apply_filters(results, filters)
@@ -72,7 +181,66 @@ class SearchEngine:
         all_results.sort(key=lambda x: x.get('similarity', 0), reverse=True)
         
         # 限制结果数量
-        return all_results[:limit]
+        results = all_results[:limit]
+        
+        # 更新缓存，超出容量时淘汰最久未使用的条目
+        if cache_key is not None:
+            with self._result_cache_lock:
+                if generation == self._cache_generation:
+                    self._result_cache[cache_key] = results
+                    self._result_cache.move_to_end(cache_key)
+                    if len(self._result_cache) > self._result_cache_size:
+                        self._result_cache.popitem(last=False)
+        
+        # 缓存中的结果字典不直接交给调用方，避免被修改后污染后续命中
+        return [dict(result) for result in results]
+    
+    def _invalidate_result_cache(self, event: Event) -> None:
+        """
+        索引变化时清空搜索结果缓存
+        
+        Args:
+            event: 索引事件
+            
+        Returns:
+            无返回值
+        """
+        with self._result_cache_lock:
+            self._result_cache.clear()
+            self._cache_generation += 1
+        logger.debug("搜索缓存已清空: %s", event.event_type.value)
+    
+    def _search_projects(self, project_ids: List[str], query: str,
+                         limit: int) -> List[List[Dict[str, Any]]]:
+        """
+        并发搜索多个项目
+        
+        Args:
+            project_ids: 项目ID列表
+            query: 查询字符串
+            limit: 每个项目返回结果数量限制
+            
+        Returns:
+            与project_ids顺序一致的搜索结果列表
+        """
+        if len(project_ids) <= 1:
+            return [self.indexer.search(project_id, query, limit=limit) for project_id in project_ids]
+        
+        futures = [
+            self._search_pool.submit(self.indexer.search, project_id, query, limit)
+            for project_id in project_ids
+        ]
+        return [future.result() for future in futures]
+    
+    def dispose(self) -> None:
+        """
+        关闭搜索线程池，并取消缓存失效事件的订阅；系统关闭时由DI容器调用
+        
+        Returns:
+            无返回值
+        """
+        unsubscribe_all(self._invalidate_result_cache)
+        self._search_pool.shutdown(wait=False)
     
     def _apply_filters(self, results: List[Dict[str, Any]], 
                       filters: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -238,9 +406,8 @@ class SearchEngine:
             代码上下文字典
         """
         try:
-            # 读取文件内容
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                lines = f.readlines()
+            # 读取文件内容（文件未修改时命中缓存）
+            lines = _read_file_lines(file_path, os.stat(file_path).st_mtime_ns)
             
             # 计算上下文范围
             start_line = max(1, line_number - context_lines)
@@ -278,31 +445,9 @@ class SearchEngine:
             文件概览字典
         """
         try:
-            # 读取文件内容
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            
-            # 获取文件大小
-            file_size = os.path.getsize(file_path)
-            
-            # 获取行数
-            lines = content.split('\n')
-            line_count = len(lines)
-            
-            # 获取文件扩展名
-            _, ext = os.path.splitext(file_path)
-            
-            # 提取文件头部（最多100行）
-            header = '\n'.join(lines[:min(100, line_count)])
-            
-            return {
-                'file_path': file_path,
-                'file_name': os.path.basename(file_path),
-                'file_size': file_size,
-                'line_count': line_count,
-                'extension': ext,
-                'header': header
-            }
+            # 文件未修改时直接返回缓存的概览
+            stat = os.stat(file_path)
+            return dict(_build_file_overview(file_path, stat.st_mtime_ns, stat.st_size))
         except Exception as e:
             logger.error(f"获取文件概览失败 {file_path}: {str(e)}")
             return {
@@ -311,6 +456,18 @@ class SearchEngine:
                 'error': str(e)
             }
             
+    def file_cache_info(self) -> Dict[str, Any]:
+        """
+        获取文件读取缓存的统计信息
+        
+        Returns:
+            包含文件行缓存和概览缓存统计的字典
+        """
+        return {
+            'lines': _read_file_lines.cache_info()._asdict(),
+            'overview': _build_file_overview.cache_info()._asdict()
+        }
+    
     def find_similar_code(self, code: str, language: str = None,
                          threshold: float = 0.7, limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -341,18 +498,14 @@ class SearchEngine:
             indexed_projects = self.indexer.get_indexed_projects()
             
             # 记录开始时间，用于性能监控
-            import time
             start_time = time.time()
             
             # 首先使用向量搜索找到候选结果
             candidate_results = []
-            for project in indexed_projects:
-                project_id = project.get("project_id")
-                if not project_id:
-                    continue
-                    
-                # 搜索相似代码，增加搜索范围以提高召回率
-                search_results = self.indexer.search(project_id, normalized_code, limit=limit*3)
+            project_ids = [p.get("project_id") for p in indexed_projects if p.get("project_id")]
+            
+            # 搜索相似代码，增加搜索范围以提高召回率
+            for search_results in self._search_projects(project_ids, normalized_code, limit*3):
                 candidate_results.extend(search_results)
             
             # 对每个候选结果计算详细相似度
@@ -394,14 +547,12 @@ class SearchEngine:
             
             # 记录搜索时间
             search_time = time.time() - start_time
-            logger.info(f"相似代码搜索完成，耗时: {search_time:.2f}秒，找到 {len(results)} 个结果")
+            logger.info("相似代码搜索完成，耗时: %.2f秒，找到 %d 个结果", search_time, len(results))
             
             return results[:limit]
             
         except Exception as e:
-            logger.error(f"查找相似代码失败: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("查找相似代码失败: %s", e)
             return []
             
     def _normalize_code(self, code: str, language: str = None) -> str:
@@ -507,8 +658,7 @@ class SearchEngine:
                 # 移除变量类型声明（适用于静态类型语言）
                 if language in ['java', 'c', 'cpp', 'csharp', 'typescript']:
                     # 简化类型声明，如 "int x = 5;" -> "x = 5;"
-                    import re
-                    processed_line = re.sub(r'\b(int|float|double|char|boolean|string|var|let|const|auto)\b\s+([a-zA-Z_][a-zA-Z0-9_]*)', r'\2', processed_line)
+                    processed_line = _TYPE_DECL_RE.sub(r'\2', processed_line)
             
             # 移除多余空白字符
             processed_line = ' '.join(processed_line.split())
@@ -662,10 +812,8 @@ class SearchEngine:
     
     def _tokenize_code_line(self, line: str) -> List[str]:
         """将代码行分解为标记"""
-        import re
         # 分割标识符、运算符、括号等
-        tokens = re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*|[0-9]+|[+\-*/=<>!&|^~%]+|[{}()\[\],.;:]', line)
-        return tokens
+        return _TOKEN_RE.findall(line)
     
     def _longest_common_subsequence(self, seq1: List[str], seq2: List[str]) -> int:
         """计算最长公共子序列长度"""
@@ -711,9 +859,8 @@ class SearchEngine:
     def _calculate_semantic_similarity(self, code1: str, code2: str) -> float:
         """计算代码的语义相似度"""
         # 提取所有标识符
-        import re
-        identifiers1 = set(re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', code1))
-        identifiers2 = set(re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', code2))
+        identifiers1 = set(_IDENTIFIER_RE.findall(code1))
+        identifiers2 = set(_IDENTIFIER_RE.findall(code2))
         
         # 过滤掉关键字
         keywords = {'if', 'else', 'for', 'while', 'return', 'function', 'class', 'var', 'let', 'const', 'import', 'export'}
@@ -733,23 +880,9 @@ class SearchEngine:
     
     def _calculate_control_flow_similarity(self, code1: str, code2: str, language: str = None) -> float:
         """计算控制流相似度"""
-        # 提取控制流结构
-        control_patterns = {
-            'if': r'\bif\b',
-            'else': r'\belse\b',
-            'for': r'\bfor\b',
-            'while': r'\bwhile\b',
-            'switch': r'\bswitch\b',
-            'case': r'\bcase\b',
-            'try': r'\btry\b',
-            'catch': r'\bcatch\b',
-            'return': r'\breturn\b'
-        }
-        
         # 计算每种控制结构的出现次数
-        import re
-        control_counts1 = {pattern: len(re.findall(regex, code1)) for pattern, regex in control_patterns.items()}
-        control_counts2 = {pattern: len(re.findall(regex, code2)) for pattern, regex in control_patterns.items()}
+        control_counts1 = {pattern: len(regex.findall(code1)) for pattern, regex in _CONTROL_PATTERNS.items()}
+        control_counts2 = {pattern: len(regex.findall(code2)) for pattern, regex in _CONTROL_PATTERNS.items()}
         
         # 计算控制结构分布的相似度
         total_structures1 = sum(control_counts1.values())
@@ -762,12 +895,12 @@ class SearchEngine:
         
         # 计算每种控制结构的比例差异
         similarity = 0.0
-        for pattern in control_patterns:
+        for pattern in _CONTROL_PATTERNS:
             ratio1 = control_counts1[pattern] / total_structures1 if total_structures1 > 0 else 0
             ratio2 = control_counts2[pattern] / total_structures2 if total_structures2 > 0 else 0
             similarity += 1.0 - abs(ratio1 - ratio2)
             
-        return similarity / len(control_patterns)
+        return similarity / len(_CONTROL_PATTERNS)
 
     def natural_language_search(self, query: str, project_ids: Optional[List[str]] = None,
                               filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> Dict[str, Any]:
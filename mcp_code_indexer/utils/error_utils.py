@@ -79,11 +79,11 @@ def handle_exception(exception: Exception, component: str = None) -> Dict[str, A
     # Get exception details
     error_type = type(exception).__name__
     error_message = str(exception)
-    error_traceback = traceback.format_exc()
     
-    # Log the error
-    logger.error(f"Error in {component or 'unknown'}: {error_type}: {error_message}")
-    logger.debug(error_traceback)
+    # Log the error; the traceback is only formatted when debug logging is on
+    logger.error("Error in %s: %s: %s", component or 'unknown', error_type, error_message)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(traceback.format_exc())
     
     # Create error response
     error_response = {
@@ -4,8 +4,83 @@ JSON Utilities Module
 Provides utility functions for working with JSON data and serialization.
 """
 
+import json
 from typing import Any, Dict, List, Set, Union
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    """
+    Serialize values the JSON encoders do not handle natively.
+    
+    Args:
+        obj: The value to serialize
+        
+    Returns:
+        A JSON-compatible value
+        
+    Raises:
+        TypeError: If the value is not supported
+    """
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def fast_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document, with orjson when it is installed.
+    
+    Args:
+        data: The JSON text
+        
+    Returns:
+        The parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def fast_dumps(obj: Any) -> str:
+    """
+    Serialize an object to compact JSON, with orjson when it is installed.
+    
+    Args:
+        obj: The object to serialize, which may contain sets
+        
+    Returns:
+        The JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=_json_default)
+
+
+def dumps_indented(obj: Any, ensure_ascii: bool = True) -> str:
+    """
+    Serialize an object to JSON indented by two spaces, converting sets to lists on the fly.
+    
+    Uses orjson when it is installed and falls back to the standard library otherwise.
+    orjson always emits UTF-8, so ensure_ascii only affects the fallback.
+    
+    Args:
+        obj: The object to serialize, which may contain sets
+        ensure_ascii: Escape non-ASCII characters in the standard library output
+        
+    Returns:
+        The JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=ensure_ascii, default=_json_default)
+
 
 def convert_sets_to_lists(obj: Any) -> Any:
     """
@@ -6,20 +6,11 @@
 # 不要在包初始化时直接导入模块，避免循环导入问题
 # 改为在需要时导入
 
-# 导出主要函数，方便用户直接从包中导入
-from .unified_server import (
-    initialize_components,
-    setup_routes,
-    run_rest_api,
-    run_mcp_server,
-    main
-)
-
 __all__ = [
     "initialize_components",
     "setup_routes",
-    "run_rest_api",
-    "run_mcp_server",
+    "setup_mcp_routes",
+    "setup_app",
     "main"
 ]
 
@@ -28,6 +19,27 @@ def main(*args, **kwargs):
     from .app import main as app_main
     return app_main(*args, **kwargs)
 
+def initialize_components(*args, **kwargs):
+    from mcp_code_indexer.component_registry import initialize_components as registry_initialize_components
+    return registry_initialize_components(*args, **kwargs)
+
 def setup_routes(*args, **kwargs):
     from .api import setup_routes as api_setup_routes
-    return api_setup_routes(*args, **kwargs)
\ No newline at end of file
+    return api_setup_routes(*args, **kwargs)
+
+def setup_mcp_routes(*args, **kwargs):
+    from .mcp_capabilities import setup_mcp_routes as capabilities_setup_mcp_routes
+    return capabilities_setup_mcp_routes(*args, **kwargs)
+
+def setup_app(app):
+    """
+    在同一个Flask应用上注册REST与MCP路由，共用一套请求钩子、JSON提供器和组件
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        无返回值
+    """
+    setup_routes(app)
+    setup_mcp_routes(app)
@@ -4,12 +4,180 @@ API路由模块
 """
 
 import os
+import gzip
+import json
+import time
 import logging
-from typing import Dict, Any, List, Optional
-from flask import Flask, jsonify, request, current_app
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from flask import Flask, Response, jsonify, request, current_app, stream_with_context
+
+from mcp_code_indexer.events import EventType, subscribe
+from mcp_code_indexer.component_registry import ComponentRegistry, get_registry
+
+# orjson与Flask 2.2+的JSON提供器接口为可选依赖
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    class _OrjsonProvider(DefaultJSONProvider):
+        """使用orjson序列化响应的JSON提供器，直接在C层完成编码"""
+        
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+        
+        def loads(self, s: Any, **kwargs: Any) -> Any:
+            return orjson.loads(s)
+
+class _ResponseCache:
+    """带过期时间的LRU响应缓存，缓存只读接口的响应数据
+    
+    过期条目保留到被LRU淘汰，后端出错时可作为陈旧响应返回
+    """
+    
+    def __init__(self, max_size: int = 256):
+        """
+        初始化响应缓存
+        
+        Args:
+            max_size: 最大缓存条目数
+        """
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        获取未过期的缓存响应
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            响应数据，未命中时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def get_stale(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存响应，不检查是否过期
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            响应数据，从未缓存时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+    
+    def put(self, key: Tuple, value: Dict[str, Any], ttl: float) -> None:
+        """
+        缓存响应
+        
+        Args:
+            key: 缓存键
+            value: 响应数据
+            ttl: 有效期（秒）
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, namespace: str) -> None:
+        """
+        使某个接口的全部缓存过期
+        
+        Args:
+            namespace: 接口命名空间，即缓存键的第一项
+        """
+        with self._lock:
+            for key, (_, value) in self._entries.items():
+                if key[0] == namespace:
+                    self._entries[key] = (0.0, value)
+
+# 小于该大小的响应不压缩，压缩收益不抵CPU开销
+_GZIP_MIN_SIZE = 1024
+_GZIP_LEVEL = 5
+
+def _gzip_response(response: Response) -> Response:
+    """
+    客户端支持时使用gzip压缩较大的响应
+    
+    Args:
+        response: 响应对象
+        
+    Returns:
+        原响应对象，可能已被压缩
+    """
+    if (response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+        return response
+    
+    data = response.get_data()
+    if len(data) < _GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=_GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+# 健康检查响应固定不变，导入时序列化一次
+_HEALTH_BODY = json.dumps({'status': 'ok', 'version': '0.1.0'}).encode('utf-8')
+
+# 只读接口的响应缓存及各接口有效期（秒）
+_response_cache = _ResponseCache()
+_PROJECTS_TTL = 60
+_CONTEXT_TTL = 600
+
+def _invalidate_index_caches(event: Any = None) -> None:
+    """索引完成、失败或删除后，项目列表和依赖索引的上下文（相关代码块）发生变化，清除其缓存"""
+    _response_cache.invalidate("projects")
+    _response_cache.invalidate("context")
+
+subscribe(EventType.INDEXING_COMPLETED, _invalidate_index_caches)
+subscribe(EventType.INDEXING_FAILED, _invalidate_index_caches)
+subscribe(EventType.INDEX_DELETED, _invalidate_index_caches)
+
+def bind_components(app: Flask, registry: Optional[ComponentRegistry] = None) -> None:
+    """
+    将进程共享的组件绑定到Flask应用，各路由模块使用同一组索引器、搜索引擎和格式化器
+    
+    Args:
+        app: Flask应用实例
+        registry: 组件注册表，默认使用进程内已初始化的注册表
+        
+    Returns:
+        无返回值
+    """
+    registry = registry or get_registry()
+    if registry is None:
+        return
+    
+    # 已显式配置的组件保持不变
+    app.config.setdefault('mcp_indexer', registry.get_component("indexer"))
+    app.config.setdefault('mcp_search_engine', registry.get_component("search_engine"))
+    app.config.setdefault('mcp_formatter', registry.get_component("formatter"))
+
 def setup_routes(app: Flask) -> None:
     """
     设置API路由
@@ -20,6 +188,16 @@ def setup_routes(app: Flask) -> None:
     Returns:
         无返回值
     """
+    # 使用进程共享的组件
+    bind_components(app)
+    
+    # 压缩较大的响应，搜索和上下文结果通常有数KB以上
+    app.after_request(_gzip_response)
+    
+    # 可用时使用orjson序列化所有jsonify响应
+    if orjson is not None:
+        app.json = _OrjsonProvider(app)
+    
     # 健康检查
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -29,10 +207,7 @@ def setup_routes(app: Flask) -> None:
         Returns:
             健康状态响应
         """
-        return jsonify({
-            'status': 'ok',
-            'version': '0.1.0'
-        })
+        return app.response_class(_HEALTH_BODY, mimetype='application/json')
     
     # 项目识别
     @app.route('/api/project/identify', methods=['POST'])
@@ -48,7 +223,7 @@ def setup_routes(app: Flask) -> None:
         Returns:
             项目识别结果
         """
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'project_path' not in data:
             return jsonify({
                 'error': '无效请求',
@@ -105,7 +280,7 @@ def setup_routes(app: Flask) -> None:
         Returns:
             索引启动结果
         """
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'project_path' not in data:
             return jsonify({
                 'error': 'Invalid request',
@@ -194,10 +369,12 @@ def setup_routes(app: Flask) -> None:
             "limit": 10                           // 可选
         }
         
+        查询参数 stream=true 时以NDJSON逐行返回代码块，客户端可边接收边处理
+        
         Returns:
             搜索结果
         """
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'query' not in data:
             return jsonify({
                 'error': '无效请求',
@@ -217,6 +394,16 @@ def setup_routes(app: Flask) -> None:
             # 执行搜索
             results = search_engine.search(query, project_ids, filters, limit)
             
+            # 流式返回，每行一个代码块，不在内存中构建完整响应
+            if request.args.get('stream', '').lower() == 'true':
+                dumps = current_app.json.dumps if hasattr(current_app, 'json') else json.dumps
+                
+                def generate():
+                    for code_block in formatter.iter_code_blocks(results):
+                        yield dumps(code_block) + "\n"
+                
+                return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+            
             # 格式化响应
             response = formatter.format_search_results(results, query)
             
@@ -227,7 +414,59 @@ def setup_routes(app: Flask) -> None:
                 'error': '搜索失败',
                 'message': str(e)
             }), 500
-    
+
+    # 批量搜索代码
+    @app.route('/api/search/batch', methods=['POST'])
+    def search_code_batch():
+        """
+        批量搜索代码接口，一次请求执行多个查询
+
+        请求体:
+        {
+            "queries": [
+                {"query": "查询字符串", "project_ids": [...], "filters": {...}, "limit": 10},
+                ...
+            ]
+        }
+
+        Returns:
+            与queries顺序一致的搜索结果列表，单个查询失败不影响其他查询
+        """
+        data = request.get_json(silent=True)
+        queries = data.get('queries') if isinstance(data, dict) else None
+        if not isinstance(queries, list) or not queries:
+            return jsonify({
+                'error': '无效请求',
+                'message': '缺少queries参数'
+            }), 400
+
+        search_engine = current_app.config['mcp_search_engine']
+        formatter = current_app.config['mcp_formatter']
+
+        # 整批查询在同一个请求线程中执行，限制单次请求的查询数量
+        max_batch = search_engine.config.get("search.max_batch", 64)
+        if len(queries) > max_batch:
+            return jsonify({
+                'error': '无效请求',
+                'message': f'查询数量超过上限: {len(queries)} > {max_batch}'
+            }), 400
+
+        responses = []
+        for item in queries:
+            if not isinstance(item, dict) or 'query' not in item:
+                responses.append({'error': '无效请求', 'message': '缺少查询参数'})
+                continue
+
+            try:
+                results = search_engine.search(item['query'], item.get('project_ids'),
+                                               item.get('filters'), item.get('limit', 10))
+                responses.append(formatter.format_search_results(results, item['query']))
+            except Exception as e:
+                logger.error(f"搜索代码失败: {str(e)}")
+                responses.append({'error': '搜索失败', 'message': str(e)})
+
+        return jsonify({'results': responses})
+
     # 获取代码上下文
     @app.route('/api/context', methods=['POST'])
     def get_code_context():
@@ -244,7 +483,7 @@ def setup_routes(app: Flask) -> None:
         Returns:
             代码上下文
         """
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'file_path' not in data or 'line_number' not in data:
             return jsonify({
                 'error': '无效请求',
@@ -262,6 +501,12 @@ def setup_routes(app: Flask) -> None:
             }), 400
         
         try:
+            # 文件修改时间作为缓存键的一部分，文件变化后不会命中旧结果
+            cache_key = ("context", file_path, os.stat(file_path).st_mtime_ns, line_number, context_lines)
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                return jsonify(cached)
+            
             # 获取组件
             search_engine = current_app.config['mcp_search_engine']
             formatter = current_app.config['mcp_formatter']
@@ -274,6 +519,7 @@ def setup_routes(app: Flask) -> None:
             
             # 格式化响应
             response = formatter.format_code_context(context, related_blocks)
+            _response_cache.put(cache_key, response, _CONTEXT_TTL)
             
             return jsonify(response)
         except Exception as e:
@@ -293,18 +539,33 @@ def setup_routes(app: Flask) -> None:
             项目列表
         """
         try:
+            cached = _response_cache.get(("projects",))
+            if cached is not None:
+                return jsonify(cached)
+            
             # 获取组件
             indexer = current_app.config['mcp_indexer']
             
             # 获取项目列表
             projects = indexer.get_indexed_projects()
             
-            return jsonify({
+            response = {
                 'projects': projects,
                 'count': len(projects)
-            })
+            }
+            _response_cache.put(("projects",), response, _PROJECTS_TTL)
+            
+            return jsonify(response)
         except Exception as e:
             logger.error(f"获取项目列表失败: {str(e)}")
+            
+            # 后端不可用时返回最近一次成功的响应，而不是直接报错
+            stale = _response_cache.get_stale(("projects",))
+            if stale is not None:
+                response = jsonify(stale)
+                response.headers['X-Cache'] = 'stale'
+                return response
+            
             return jsonify({
                 'error': '获取项目列表失败',
                 'message': str(e)
@@ -328,6 +589,7 @@ def setup_routes(app: Flask) -> None:
             
             # 删除项目索引
             success = indexer.delete_project_index(project_id)
+            _invalidate_index_caches()
             
             if success:
                 return jsonify({
@@ -9,6 +9,13 @@ import logging
 import argparse
 import locale
 import asyncio
+from pathlib import Path
+
+# uvloop为可选依赖，可用时替换默认事件循环
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # 设置控制台编码为UTF-8以解决编码问题
 if sys.platform == 'win32':
@@ -21,14 +28,17 @@ else:
     if locale.getpreferredencoding().upper() != 'UTF-8':
         locale.setlocale(locale.LC_ALL, 'en_US.UTF-8')
 
-# 将项目根目录添加到Python路径
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# 将项目根目录添加到Python路径（通过 pip install -e . 安装后已在路径中）
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 # 从MCP库导入stdio_server函数
 from mcp.server.stdio import stdio_server
 
 from mcp_code_indexer.config import Config
-from mcp_code_indexer.factory import create_all_components
+from mcp_code_indexer.component_registry import initialize_components
+from mcp_code_indexer.events import EventType, Event, publish
 
 # 使用绝对导入，避免作为脚本直接运行时的问题
 from server.mcp_server import setup_mcp_server
@@ -101,11 +111,11 @@ def main():
         # 加载配置
         config = Config(args.config)
         
-        # 使用工厂创建组件
-        components = create_all_components(config)
-        indexer = components["indexer"]
-        search_engine = components["search_engine"]
-        agent_manager = components["agent_manager"]
+        # 通过组件注册表创建组件，进程内其他调用方（如默认的MCPCodeIndexer）复用同一组实例
+        registry = initialize_components(config)
+        indexer = registry.get_component("indexer")
+        search_engine = registry.get_component("search_engine")
+        agent_manager = registry.get_component("agent_manager")
         
         # 创建MCP服务器
         server = setup_mcp_server(config, indexer, search_engine, agent_manager)
@@ -118,8 +128,14 @@ def main():
         signal.signal(signal.SIGINT, handle_exit)
         signal.signal(signal.SIGTERM, handle_exit)
         
-        # 运行服务器
-        asyncio.run(run_server(server))
+        # 运行服务器，可用时使用基于libuv的uvloop事件循环
+        if uvloop is not None:
+            uvloop.install()
+        try:
+            asyncio.run(run_server(server))
+        finally:
+            # 发布系统关闭事件，由DI容器释放各组件的线程池和事件循环
+            publish(Event(EventType.SYSTEM_SHUTDOWN, {}, "mcp_server"))
         
     except KeyboardInterrupt:
         sys.exit(0)
@@ -4,10 +4,15 @@ MCP协议能力接口模块
 """
 
 import os
+import json
+import time
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 from flask import Flask, jsonify, request, current_app
 
+from .api import bind_components
+
 logger = logging.getLogger(__name__)
 
 def setup_mcp_routes(app: Flask) -> None:
@@ -20,10 +25,37 @@ def setup_mcp_routes(app: Flask) -> None:
     Returns:
         无返回值
     """
+    # 与REST路由共用进程内同一组组件
+    bind_components(app)
+    
     # MCP协议版本
     MCP_VERSION = "0.1"
     
+    def _static_json(obj):
+        """
+        预先序列化固定的响应内容，每次请求只创建响应对象
+        
+        Args:
+            obj: 响应数据
+            
+        Returns:
+            创建JSON响应的函数
+        """
+        body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        return lambda: app.response_class(body, mimetype='application/json')
+    
     # MCP协议根路径
+    # 协议信息不会变化，启动时序列化一次
+    root_response = _static_json({
+        "name": "MCP Code Indexer",
+        "version": MCP_VERSION,
+        "description": "基于MCP协议的代码检索工具，为AI大语言模型提供高效、准确的代码库检索能力",
+        "capabilities": [
+            "tools",
+            "resources"
+        ]
+    })
+    
     @app.route('/mcp', methods=['GET'])
     def mcp_root():
         """
@@ -32,17 +64,25 @@ def setup_mcp_routes(app: Flask) -> None:
         Returns:
             MCP协议信息
         """
-        return jsonify({
-            "name": "MCP Code Indexer",
-            "version": MCP_VERSION,
-            "description": "基于MCP协议的代码检索工具，为AI大语言模型提供高效、准确的代码库检索能力",
-            "capabilities": [
-                "tools",
-                "resources"
-            ]
-        })
+        return root_response()
     
     # MCP协议能力接口
+    # 能力描述不会变化，启动时序列化一次
+    capabilities_response = _static_json({
+        "version": MCP_VERSION,
+        "capabilities": {
+            "tools": {
+                "list": "/mcp/tools",
+                "call": "/mcp/tools/call"
+            },
+            "resources": {
+                "list": "/mcp/resources",
+                "templates": "/mcp/resource-templates",
+                "read": "/mcp/resources/read"
+            }
+        }
+    })
+    
     @app.route('/mcp/capabilities', methods=['GET'])
     def mcp_capabilities():
         """
@@ -51,22 +91,120 @@ def setup_mcp_routes(app: Flask) -> None:
         Returns:
             MCP协议能力描述
         """
-        return jsonify({
-            "version": MCP_VERSION,
-            "capabilities": {
-                "tools": {
-                    "list": "/mcp/tools",
-                    "call": "/mcp/tools/call"
-                },
-                "resources": {
-                    "list": "/mcp/resources",
-                    "templates": "/mcp/resource-templates",
-                    "read": "/mcp/resources/read"
+        return capabilities_response()
+    
+    # MCP工具列表接口
+    # 工具列表不会变化，启动时序列化一次
+    tools_response = _static_json({
+        "tools": [
+            {
+                "name": "identify_project",
+                "description": "识别代码项目，返回项目ID和状态",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_path": {
+                            "type": "string",
+                            "description": "项目路径"
+                        }
+                    },
+                    "required": ["project_path"]
+                }
+            },
+            {
+                "name": "index_project",
+                "description": "索引代码项目，生成向量索引",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_path": {
+                            "type": "string",
+                            "description": "项目路径"
+                        },
+                        "wait": {
+                            "type": "boolean",
+                            "description": "是否等待索引完成",
+                            "default": False
+                        }
+                    },
+                    "required": ["project_path"]
+                }
+            },
+            {
+                "name": "search_code",
+                "description": "搜索代码，返回相关代码片段",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "搜索查询字符串"
+                        },
+                        "project_id": {
+                            "type": "string",
+                            "description": "项目ID，如果不提供则搜索所有项目"
+                        },
+                        "language": {
+                            "type": "string",
+                            "description": "编程语言过滤"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "返回结果数量限制",
+                            "default": 10
+                        }
+                    },
+                    "required": ["query"]
+                }
+            },
+            {
+                "name": "get_project_status",
+                "description": "获取项目索引状态",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {
+                            "type": "string",
+                            "description": "项目ID"
+                        }
+                    },
+                    "required": ["project_id"]
+                }
+            },
+            {
+                "name": "get_projects",
+                "description": "获取所有已索引的项目列表",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {}
+                }
+            },
+            {
+                "name": "get_code_context",
+                "description": "获取代码上下文",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "file_path": {
+                            "type": "string",
+                            "description": "文件路径"
+                        },
+                        "line_number": {
+                            "type": "integer",
+                            "description": "行号"
+                        },
+                        "context_lines": {
+                            "type": "integer",
+                            "description": "上下文行数",
+                            "default": 10
+                        }
+                    },
+                    "required": ["file_path", "line_number"]
                 }
             }
-        })
+        ]
+    })
     
-    # MCP工具列表接口
     @app.route('/mcp/tools', methods=['GET'])
     def mcp_tools():
         """
@@ -75,115 +213,152 @@ def setup_mcp_routes(app: Flask) -> None:
         Returns:
             MCP工具列表
         """
+        return tools_response()
+    
+    # 构建只含一段文本内容的工具调用响应
+    def _text_result(text):
         return jsonify({
-            "tools": [
-                {
-                    "name": "identify_project",
-                    "description": "识别代码项目，返回项目ID和状态",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "project_path": {
-                                "type": "string",
-                                "description": "项目路径"
-                            }
-                        },
-                        "required": ["project_path"]
-                    }
-                },
+            "content": [
                 {
-                    "name": "index_project",
-                    "description": "索引代码项目，生成向量索引",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "project_path": {
-                                "type": "string",
-                                "description": "项目路径"
-                            },
-                            "wait": {
-                                "type": "boolean",
-                                "description": "是否等待索引完成",
-                                "default": false
-                            }
-                        },
-                        "required": ["project_path"]
-                    }
-                },
-                {
-                    "name": "search_code",
-                    "description": "搜索代码，返回相关代码片段",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "搜索查询字符串"
-                            },
-                            "project_id": {
-                                "type": "string",
-                                "description": "项目ID，如果不提供则搜索所有项目"
-                            },
-                            "language": {
-                                "type": "string",
-                                "description": "编程语言过滤"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "返回结果数量限制",
-                                "default": 10
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                },
-                {
-                    "name": "get_project_status",
-                    "description": "获取项目索引状态",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "project_id": {
-                                "type": "string",
-                                "description": "项目ID"
-                            }
-                        },
-                        "required": ["project_id"]
-                    }
-                },
-                {
-                    "name": "get_projects",
-                    "description": "获取所有已索引的项目列表",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {}
-                    }
-                },
-                {
-                    "name": "get_code_context",
-                    "description": "获取代码上下文",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "file_path": {
-                                "type": "string",
-                                "description": "文件路径"
-                            },
-                            "line_number": {
-                                "type": "integer",
-                                "description": "行号"
-                            },
-                            "context_lines": {
-                                "type": "integer",
-                                "description": "上下文行数",
-                                "default": 10
-                            }
-                        },
-                        "required": ["file_path", "line_number"]
-                    }
+                    "type": "text",
+                    "text": text
                 }
             ]
         })
+
+    # MCP工具调用处理函数，参数已在分发前校验
+    def _call_identify_project(arguments, indexer, search_engine):
+        project_id, is_new, metadata = indexer.project_identifier.identify_project(arguments['project_path'])
+        status, progress = indexer.get_indexing_status(project_id)
+        
+        return _text_result(f"项目识别成功。项目ID: {project_id}, 状态: {status}, 进度: {progress:.1%}")
+
+    def _call_index_project(arguments, indexer, search_engine):
+        wait = arguments.get('wait', False)
+        
+        if wait:
+            # 识别项目
+            project_id, _, _ = indexer.project_identifier.identify_project(arguments['project_path'])
+            
+            # 索引完成时通过回调唤醒等待
+            finished = threading.Event()
+            
+            def on_progress(status, progress):
+                if status == "completed" or status == "failed":
+                    finished.set()
+            
+            # 启动索引
+            indexer.index_project(arguments['project_path'], progress_callback=on_progress)
+            
+            # 等待索引完成，定期检查状态以覆盖由其他调用方启动的索引
+            max_wait = 300  # 最多等待5分钟
+            deadline = time.time() + max_wait
+            status, progress = indexer.get_indexing_status(project_id)
+            while status != "completed" and status != "failed" and time.time() < deadline:
+                finished.wait(2)
+                status, progress = indexer.get_indexing_status(project_id)
+            
+            return _text_result(f"项目索引{status}。项目ID: {project_id}, 进度: {progress:.1%}")
+        else:
+            # 启动索引但不等待
+            project_id = indexer.index_project(arguments['project_path'])
+            
+            return _text_result(f"项目索引已启动。项目ID: {project_id}")
+
+    def _call_search_code(arguments, indexer, search_engine):
+        # 构建过滤条件
+        filters = {}
+        if 'language' in arguments:
+            filters['language'] = arguments['language']
+        
+        # 构建项目ID列表
+        project_ids = [arguments['project_id']] if 'project_id' in arguments else None
+        
+        # 执行搜索
+        limit = arguments.get('limit', 10)
+        results = search_engine.search(arguments['query'], project_ids, filters, limit)
+        
+        # 格式化结果
+        formatted_results = []
+        for i, result in enumerate(results):
+            file_path = result.get('file_path', '')
+            language = result.get('language', 'text')
+            start_line = result.get('start_line', 1)
+            end_line = result.get('end_line', 1)
+            content = result.get('content', '')
+            
+            formatted_results.append(f"### {i+1}. {os.path.basename(file_path)} (行 {start_line}-{end_line})")
+            formatted_results.append(f"文件: {file_path}")
+            formatted_results.append(f"```{language}")
+            formatted_results.append(content)
+            formatted_results.append("```")
+            formatted_results.append("")
+        
+        if not formatted_results:
+            formatted_results = ["未找到匹配的代码。"]
+        
+        return _text_result("\n".join(formatted_results))
+
+    def _call_get_project_status(arguments, indexer, search_engine):
+        status, progress = indexer.get_indexing_status(arguments['project_id'])
+        
+        return _text_result(f"项目状态: {status}, 进度: {progress:.1%}")
+
+    def _call_get_projects(arguments, indexer, search_engine):
+        projects = indexer.get_indexed_projects()
+        
+        if not projects:
+            return _text_result("没有已索引的项目。")
+        
+        formatted_projects = ["已索引的项目:"]
+        for i, project in enumerate(projects):
+            project_id = project.get('project_id', '')
+            project_path = project.get('project_path', '')
+            status = project.get('status', '')
+            
+            formatted_projects.append(f"{i+1}. ID: {project_id}")
+            formatted_projects.append(f"   路径: {project_path}")
+            formatted_projects.append(f"   状态: {status}")
+            formatted_projects.append("")
+        
+        return _text_result("\n".join(formatted_projects))
+
+    def _call_get_code_context(arguments, indexer, search_engine):
+        context_lines = arguments.get('context_lines', 10)
+        context = search_engine.get_code_context(
+            arguments['file_path'],
+            arguments['line_number'],
+            context_lines
+        )
+        
+        file_path = context.get('file_path', '')
+        start_line = context.get('start_line', 1)
+        end_line = context.get('end_line', 1)
+        target_line = context.get('target_line', 1)
+        content = context.get('content', '')
+        
+        language = search_engine._guess_language(file_path)
+        
+        return _text_result(f"文件: {file_path} (行 {start_line}-{end_line}, 目标行: {target_line})\n\n```{language}\n{content}\n```")
+
+    # 工具名称到处理函数的映射
+    tool_handlers = {
+        "identify_project": _call_identify_project,
+        "index_project": _call_index_project,
+        "search_code": _call_search_code,
+        "get_project_status": _call_get_project_status,
+        "get_projects": _call_get_projects,
+        "get_code_context": _call_get_code_context
+    }
+    
+    # 各工具的必需参数，在分发前统一校验
+    tool_required_args = {
+        "identify_project": ("project_path",),
+        "index_project": ("project_path",),
+        "search_code": ("query",),
+        "get_project_status": ("project_id",),
+        "get_code_context": ("file_path", "line_number")
+    }
     
     # MCP工具调用接口
     @app.route('/mcp/tools/call', methods=['POST'])
@@ -194,226 +369,44 @@ def setup_mcp_routes(app: Flask) -> None:
         Returns:
             工具调用结果
         """
-        data = request.json
-        if not data or 'name' not in data or 'arguments' not in data:
+        # 请求体不是合法JSON时返回None，而不是抛出异常
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or (tool_name := data.get('name')) is None:
             return jsonify({
                 "error": "Invalid request",
-                "message": "Missing name or arguments"
+                "message": "Missing tool name"
             }), 400
         
-        tool_name = data['name']
-        arguments = data['arguments']
+        # 无参数的工具可以省略arguments
+        arguments = data.get('arguments') or {}
+        if not isinstance(arguments, dict):
+            return jsonify({
+                "error": "Invalid request",
+                "message": "Arguments must be an object"
+            }), 400
+        
+        handler = tool_handlers.get(tool_name)
+        if handler is None:
+            return jsonify({
+                "error": "Unknown tool",
+                "message": f"Tool not found: {tool_name}"
+            }), 404
+        
+        missing = [arg for arg in tool_required_args.get(tool_name, ()) if arg not in arguments]
+        if missing:
+            return jsonify({
+                "error": "Invalid arguments",
+                "message": f"Missing {' or '.join(missing)}"
+            }), 400
         
         # 获取组件
         indexer = current_app.config['mcp_indexer']
         search_engine = current_app.config['mcp_search_engine']
-        formatter = current_app.config['mcp_formatter']
         
         try:
-            # 根据工具名称调用相应的功能
-            if tool_name == "identify_project":
-                if 'project_path' not in arguments:
-                    return jsonify({
-                        "error": "Invalid arguments",
-                        "message": "Missing project_path"
-                    }), 400
-                
-                project_id, is_new, metadata = indexer.project_identifier.identify_project(arguments['project_path'])
-                status, progress = indexer.get_indexing_status(project_id)
-                
-                return jsonify({
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"项目识别成功。项目ID: {project_id}, 状态: {status}, 进度: {progress:.1%}"
-                        }
-                    ]
-                })
-            
-            elif tool_name == "index_project":
-                if 'project_path' not in arguments:
-                    return jsonify({
-                        "error": "Invalid arguments",
-                        "message": "Missing project_path"
-                    }), 400
-                
-                wait = arguments.get('wait', False)
-                
-                if wait:
-                    # 识别项目
-                    project_id, _, _ = indexer.project_identifier.identify_project(arguments['project_path'])
-                    
-                    # 启动索引
-                    indexer.index_project(arguments['project_path'])
-                    
-                    # 等待索引完成
-                    import time
-                    max_wait = 300  # 最多等待5分钟
-                    start_time = time.time()
-                    while time.time() - start_time < max_wait:
-                        status, progress = indexer.get_indexing_status(project_id)
-                        if status == "completed" or status == "failed":
-                            break
-                        time.sleep(2)
-                    
-                    return jsonify({
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"项目索引{status}。项目ID: {project_id}, 进度: {progress:.1%}"
-                            }
-                        ]
-                    })
-                else:
-                    # 启动索引但不等待
-                    project_id = indexer.index_project(arguments['project_path'])
-                    
-                    return jsonify({
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"项目索引已启动。项目ID: {project_id}"
-                            }
-                        ]
-                    })
-            
-            elif tool_name == "search_code":
-                if 'query' not in arguments:
-                    return jsonify({
-                        "error": "Invalid arguments",
-                        "message": "Missing query"
-                    }), 400
-                
-                # 构建过滤条件
-                filters = {}
-                if 'language' in arguments:
-                    filters['language'] = arguments['language']
-                
-                # 构建项目ID列表
-                project_ids = [arguments['project_id']] if 'project_id' in arguments else None
-                
-                # 执行搜索
-                limit = arguments.get('limit', 10)
-                results = search_engine.search(arguments['query'], project_ids, filters, limit)
-                
-                # 格式化结果
-                formatted_results = []
-                for i, result in enumerate(results):
-                    file_path = result.get('file_path', '')
-                    language = result.get('language', 'text')
-                    start_line = result.get('start_line', 1)
-                    end_line = result.get('end_line', 1)
-                    content = result.get('content', '')
-                    
-                    formatted_results.append(f"### {i+1}. {os.path.basename(file_path)} (行 {start_line}-{end_line})")
-                    formatted_results.append(f"文件: {file_path}")
-                    formatted_results.append(f"```{language}")
-                    formatted_results.append(content)
-                    formatted_results.append("```")
-                    formatted_results.append("")
-                
-                if not formatted_results:
-                    formatted_results = ["未找到匹配的代码。"]
-                
-                return jsonify({
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "\n".join(formatted_results)
-                        }
-                    ]
-                })
-            
-            elif tool_name == "get_project_status":
-                if 'project_id' not in arguments:
-                    return jsonify({
-                        "error": "Invalid arguments",
-                        "message": "Missing project_id"
-                    }), 400
-                
-                status, progress = indexer.get_indexing_status(arguments['project_id'])
-                
-                return jsonify({
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"项目状态: {status}, 进度: {progress:.1%}"
-                        }
-                    ]
-                })
-            
-            elif tool_name == "get_projects":
-                projects = indexer.get_indexed_projects()
-                
-                if not projects:
-                    return jsonify({
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "没有已索引的项目。"
-                            }
-                        ]
-                    })
-                
-                formatted_projects = ["已索引的项目:"]
-                for i, project in enumerate(projects):
-                    project_id = project.get('project_id', '')
-                    project_path = project.get('project_path', '')
-                    status = project.get('status', '')
-                    
-                    formatted_projects.append(f"{i+1}. ID: {project_id}")
-                    formatted_projects.append(f"   路径: {project_path}")
-                    formatted_projects.append(f"   状态: {status}")
-                    formatted_projects.append("")
-                
-                return jsonify({
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "\n".join(formatted_projects)
-                        }
-                    ]
-                })
-            
-            elif tool_name == "get_code_context":
-                if 'file_path' not in arguments or 'line_number' not in arguments:
-                    return jsonify({
-                        "error": "Invalid arguments",
-                        "message": "Missing file_path or line_number"
-                    }), 400
-                
-                context_lines = arguments.get('context_lines', 10)
-                context = search_engine.get_code_context(
-                    arguments['file_path'],
-                    arguments['line_number'],
-                    context_lines
-                )
-                
-                file_path = context.get('file_path', '')
-                start_line = context.get('start_line', 1)
-                end_line = context.get('end_line', 1)
-                target_line = context.get('target_line', 1)
-                content = context.get('content', '')
-                
-                language = search_engine._guess_language(file_path)
-                
-                return jsonify({
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"文件: {file_path} (行 {start_line}-{end_line}, 目标行: {target_line})\n\n```{language}\n{content}\n```"
-                        }
-                    ]
-                })
-            
-            else:
-                return jsonify({
-                    "error": "Unknown tool",
-                    "message": f"Tool not found: {tool_name}"
-                }), 404
-                
+            return handler(arguments, indexer, search_engine)
         except Exception as e:
-            logger.error(f"工具调用失败: {str(e)}")
+            logger.error("工具调用失败: %s", e)
             return jsonify({
                 "content": [
                     {
@@ -456,6 +449,24 @@ def setup_mcp_routes(app: Flask) -> None:
         })
     
     # MCP资源模板接口
+    # 资源模板不会变化，启动时序列化一次
+    resource_templates_response = _static_json({
+        "resourceTemplates": [
+            {
+                "uriTemplate": "code://{project_id}/info",
+                "name": "项目信息",
+                "description": "获取项目的基本信息",
+                "mimeType": "application/json"
+            },
+            {
+                "uriTemplate": "code://{project_id}/file/{file_path}",
+                "name": "文件内容",
+                "description": "获取项目中指定文件的内容",
+                "mimeType": "text/plain"
+            }
+        ]
+    })
+    
     @app.route('/mcp/resource-templates', methods=['GET'])
     def mcp_resource_templates():
         """
@@ -464,22 +475,7 @@ def setup_mcp_routes(app: Flask) -> None:
         Returns:
             MCP资源模板列表
         """
-        return jsonify({
-            "resourceTemplates": [
-                {
-                    "uriTemplate": "code://{project_id}/info",
-                    "name": "项目信息",
-                    "description": "获取项目的基本信息",
-                    "mimeType": "application/json"
-                },
-                {
-                    "uriTemplate": "code://{project_id}/file/{file_path}",
-                    "name": "文件内容",
-                    "description": "获取项目中指定文件的内容",
-                    "mimeType": "text/plain"
-                }
-            ]
-        })
+        return resource_templates_response()
     
     # MCP资源读取接口
     @app.route('/mcp/resources/read', methods=['POST'])
@@ -490,7 +486,7 @@ def setup_mcp_routes(app: Flask) -> None:
         Returns:
             资源内容
         """
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'uri' not in data:
             return jsonify({
                 "error": "Invalid request",
@@ -4,10 +4,12 @@ MCP服务器模块
 """
 
 import os
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
-import json
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from mcp.server.lowlevel import Server
 from mcp.types import (
@@ -21,7 +23,8 @@ from mcp.types import (
     ResourceTemplate
 )
 
-from mcp_code_indexer.utils.json_utils import convert_sets_to_lists
+from mcp_code_indexer.utils.json_utils import dumps_indented
+from mcp_code_indexer.events import EventType, subscribe
 
 logger = logging.getLogger(__name__)
 
@@ -56,542 +59,416 @@ def setup_mcp_server(config, indexer, search_engine, agent_manager=None):
         # 返回空资源模板列表，因为我们的服务器不提供任何资源模板
         return []
     
-    # 设置工具列表请求处理程序
-    @server.list_tools()
-    async def list_tools():
-        tools = [
-            Tool(
-                name="identify_project",
-                description="识别代码项目，返回项目ID和状态",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "project_path": {
-                            "type": "string",
-                            "description": "项目路径"
-                        }
+    # 工具列表在服务器创建时构建一次，不随每次请求重建
+    tools = [
+        Tool(
+            name="identify_project",
+            description="识别代码项目，返回项目ID和状态",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project_path": {
+                        "type": "string",
+                        "description": "项目路径"
+                    }
+                },
+                "required": ["project_path"]
+            }
+        ),
+        Tool(
+            name="index_project",
+            description="索引代码项目，生成向量索引",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project_path": {
+                        "type": "string",
+                        "description": "Project path"
                     },
-                    "required": ["project_path"]
-                }
-            ),
-            Tool(
-                name="index_project",
-                description="索引代码项目，生成向量索引",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "project_path": {
-                            "type": "string",
-                            "description": "Project path"
-                        },
-                        "wait": {
-                            "type": "boolean",
-                            "description": "是否等待索引完成",
-                            "default": False
-                        }
+                    "wait": {
+                        "type": "boolean",
+                        "description": "是否等待索引完成",
+                        "default": False
+                    }
+                },
+                "required": ["project_path"]
+            }
+        ),
+        Tool(
+            name="search_code",
+            description="搜索代码，返回相关代码片段",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "搜索查询字符串"
                     },
-                    "required": ["project_path"]
-                }
-            ),
-            Tool(
-                name="search_code",
-                description="搜索代码，返回相关代码片段",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "搜索查询字符串"
-                        },
-                        "project_id": {
-                            "type": "string",
-                            "description": "项目ID，如果不提供则搜索所有项目"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "返回结果数量的限制",
-                            "default": 10
-                        }
+                    "project_id": {
+                        "type": "string",
+                        "description": "项目ID，如果不提供则搜索所有项目"
                     },
-                    "required": ["query"]
-                }
-            ),
-            Tool(
-                name="get_code_structure",
-                description="获取代码结构信息（类、函数、依赖关系）",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "文件路径"
-                        },
-                        "language": {
-                            "type": "string",
-                            "description": "编程语言"
-                        }
+                    "limit": {
+                        "type": "integer",
+                        "description": "返回结果数量的限制",
+                        "default": 10
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
+        Tool(
+            name="get_code_structure",
+            description="获取代码结构信息（类、函数、依赖关系）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "文件路径"
                     },
-                    "required": ["file_path"]
-                }
-            ),
-            Tool(
-                name="analyze_code_quality",
-                description="分析代码质量指标",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "文件路径"
-                        },
-                        "language": {
-                            "type": "string",
-                            "description": "编程语言"
-                        }
+                    "language": {
+                        "type": "string",
+                        "description": "编程语言"
+                    }
+                },
+                "required": ["file_path"]
+            }
+        ),
+        Tool(
+            name="analyze_code_quality",
+            description="分析代码质量指标",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "文件路径"
                     },
-                    "required": ["file_path"]
-                }
-            ),
-            Tool(
-                name="find_similar_code",
-                description="查找相似代码片段",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "code": {
-                            "type": "string",
-                            "description": "代码片段"
-                        },
-                        "language": {
-                            "type": "string",
-                            "description": "编程语言"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "返回结果数量限制",
-                            "default": 5
-                        }
+                    "language": {
+                        "type": "string",
+                        "description": "编程语言"
+                    }
+                },
+                "required": ["file_path"]
+            }
+        ),
+        Tool(
+            name="find_similar_code",
+            description="查找相似代码片段",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "code": {
+                        "type": "string",
+                        "description": "代码片段"
                     },
-                    "required": ["code"]
-                }
-            ),
+                    "language": {
+                        "type": "string",
+                        "description": "编程语言"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "返回结果数量限制",
+                        "default": 5
+                    }
+                },
+                "required": ["code"]
+            }
+        ),
+        Tool(
+            name="get_code_metrics",
+            description="获取代码度量数据",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "文件路径"
+                    },
+                    "language": {
+                        "type": "string",
+                        "description": "编程语言"
+                    }
+                },
+                "required": ["file_path"]
+            }
+        ),
+        Tool(
+            name="analyze_dependencies",
+            description="分析项目依赖关系",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project_path": {
+                        "type": "string",
+                        "description": "项目路径"
+                    }
+                },
+                "required": ["project_path"]
+            }
+        )
+    ]
+    
+    # 如果代理管理器可用，添加多代理分析工具
+    if agent_manager:
+        tools.append(
             Tool(
-                name="get_code_metrics",
-                description="获取代码度量数据",
+                name="multi_agent_analyze",
+                description="使用多代理系统分析代码",
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "file_path": {
                             "type": "string",
-                            "description": "文件路径"
-                        },
-                        "language": {
-                            "type": "string",
-                            "description": "编程语言"
+                            "description": "要分析的文件路径"
                         }
                     },
                     "required": ["file_path"]
                 }
-            ),
+            )
+        )
+        
+        tools.append(
             Tool(
-                name="analyze_dependencies",
-                description="分析项目依赖关系",
+                name="agent_search",
+                description="使用搜索代理搜索代码",
                 inputSchema={
                     "type": "object",
                     "properties": {
-                        "project_path": {
+                        "query": {
                             "type": "string",
-                            "description": "项目路径"
+                            "description": "搜索查询"
                         }
                     },
-                    "required": ["project_path"]
+                    "required": ["query"]
                 }
             )
+        )
+    
+    
+    # 设置工具列表请求处理程序
+    @server.list_tools()
+    async def list_tools():
+        return tools
+    
+    # 构建只含一段文本的工具结果
+    def _text(text):
+        return [
+            TextContent(
+                type="text",
+                text=text
+            )
         ]
+    
+    # 工具调用处理函数，必需参数已在call_tool中统一校验
+    def _identify_project(args):
+        project_id, is_new, metadata = indexer.project_identifier.identify_project(args["project_path"])
+        status, progress = indexer.get_indexing_status(project_id)
         
-        # 如果代理管理器可用，添加多代理分析工具
-        if agent_manager:
-            tools.append(
-                Tool(
-                    name="multi_agent_analyze",
-                    description="使用多代理系统分析代码",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "file_path": {
-                                "type": "string",
-                                "description": "要分析的文件路径"
-                            }
-                        },
-                        "required": ["file_path"]
-                    }
-                )
-            )
-            
-            tools.append(
-                Tool(
-                    name="agent_search",
-                    description="使用搜索代理搜索代码",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "搜索查询"
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                )
-            )
+        return _text(f"Project identification successful. Project ID: {project_id}, Status: {status}, Progress: {progress:.1%}")
+
+    def _index_project(args):
+        wait = args.get("wait", False)
+        finished = threading.Event()
         
-        return tools
-    
-    # 设置工具调用请求处理程序
-    @server.call_tool()
-    async def call_tool(name, args):
+        def on_progress(status, progress):
+            if status == "completed" or status == "failed":
+                finished.set()
         
-        if name == "identify_project":
-            if "project_path" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少项目路径参数"
-                    )
-                ]
-            
-            project_id, is_new, metadata = indexer.project_identifier.identify_project(args["project_path"])
+        project_id = indexer.index_project(
+            args["project_path"],
+            progress_callback=on_progress if wait else None
+        )
+        
+        if wait:
+            max_wait = 300  # Wait up to 5 minutes
+            deadline = time.time() + max_wait
             status, progress = indexer.get_indexing_status(project_id)
+            # Wake up as soon as our indexing run reports completion; the periodic
+            # status check covers runs started by another caller
+            while status != "completed" and status != "failed" and time.time() < deadline:
+                finished.wait(2)
+                status, progress = indexer.get_indexing_status(project_id)
             
-            return [
-                TextContent(
-                    type="text",
-                    text=f"Project identification successful. Project ID: {project_id}, Status: {status}, Progress: {progress:.1%}"
-                )
-            ]
+            return _text(f"Project indexing {status}. Project ID: {project_id}, Progress: {progress:.1%}")
+        else:
+            return _text(f"Project indexing started. Project ID: {project_id}")
+
+    def _search_code(args):
+        project_ids = [args["project_id"]] if "project_id" in args else None
+        limit = args.get("limit", 10)
         
-        elif name == "index_project":
-            if "project_path" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="Error: Missing project path parameter"
-                    )
-                ]
-            
-            wait = args.get("wait", False)
-            project_id = indexer.index_project(args["project_path"])
+        results = search_engine.search(args["query"], project_ids, None, limit)
+        
+        if not results:
+            return _text("未找到匹配的代码。")
+        
+        formatted_results = []
+        for i, result in enumerate(results):
+            file_path = result.get("file_path", "")
+            language = result.get("language", "text")
+            start_line = result.get("start_line", 1)
+            end_line = result.get("end_line", 1)
+            content = result.get("content", "")
             
-            if wait:
-                max_wait = 300  # Wait up to 5 minutes
-                start_time = time.time()
-                while time.time() - start_time < max_wait:
-                    status, progress = indexer.get_indexing_status(project_id)
-                    if status == "completed" or status == "failed":
-                        break
-                    time.sleep(2)
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"Project indexing {status}. Project ID: {project_id}, Progress: {progress:.1%}"
-                    )
-                ]
-            else:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"Project indexing started. Project ID: {project_id}"
-                    )
-                ]
+            formatted_results.append(f"### {i+1}. {os.path.basename(file_path)} (lines {start_line}-{end_line})")
+            formatted_results.append(f"File: {file_path}")
+            formatted_results.append(f"```{language}")
+            formatted_results.append(content)
+            formatted_results.append("```")
+            formatted_results.append("")
         
-        elif name == "search_code":
-            if "query" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少查询参数"
-                    )
-                ]
+        return _text("\n".join(formatted_results))
+
+    def _get_code_structure(args):
+        try:
+            with open(args["file_path"], 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            language = args.get("language", os.path.splitext(args["file_path"])[1][1:])
+            analyzer = indexer.optimizer.analyzer
+            
+            analysis = analyzer.analyze_code(content, language)
             
-            project_ids = [args["project_id"]] if "project_id" in args else None
-            limit = args.get("limit", 10)
+            result = {
+                "functions": analysis["functions"],
+                "classes": analysis["classes"],
+                "imports": analysis["imports"],
+                "dependencies": analysis["dependencies"]
+            }
+            
+            return _text(dumps_indented(result, ensure_ascii=False))
+        except Exception as e:
+            return _text(f"分析代码结构失败: {str(e)}")
+
+    def _analyze_code_quality(args):
+        try:
+            with open(args["file_path"], 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            language = args.get("language", os.path.splitext(args["file_path"])[1][1:])
+            optimizer = indexer.optimizer
+            
+            quality_metrics = optimizer.analyze_code_quality(content, args["file_path"], language)
+            
+            return _text(dumps_indented(quality_metrics, ensure_ascii=False))
+        except Exception as e:
+            return _text(f"分析代码质量失败: {str(e)}")
+
+    def _find_similar_code(args):
+        try:
+            code = args["code"]
+            language = args.get("language", "text")
+            limit = args.get("limit", 5)
             
-            results = search_engine.search(args["query"], project_ids, None, limit)
+            similar_code = search_engine.find_similar_code(code, language, limit)
             
-            if not results:
-                return [
-                    TextContent(
-                        type="text",
-                        text="未找到匹配的代码。"
-                    )
-                ]
+            if not similar_code:
+                return _text("未找到相似代码。")
             
             formatted_results = []
-            for i, result in enumerate(results):
+            for i, result in enumerate(similar_code):
                 file_path = result.get("file_path", "")
-                language = result.get("language", "text")
-                start_line = result.get("start_line", 1)
-                end_line = result.get("end_line", 1)
+                similarity = result.get("similarity", 0)
                 content = result.get("content", "")
                 
-                formatted_results.append(f"### {i+1}. {os.path.basename(file_path)} (lines {start_line}-{end_line})")
+                formatted_results.append(f"### {i+1}. 相似度: {similarity:.2%}")
                 formatted_results.append(f"File: {file_path}")
                 formatted_results.append(f"```{language}")
                 formatted_results.append(content)
                 formatted_results.append("```")
                 formatted_results.append("")
             
-            return [
-                TextContent(
-                    type="text",
-                    text="\n".join(formatted_results)
-                )
-            ]
+            return _text("\n".join(formatted_results))
+        except Exception as e:
+            return _text(f"查找相似代码失败: {str(e)}")
 
-        elif name == "get_code_structure":
-            if "file_path" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少文件路径参数"
-                    )
-                ]
+    def _get_code_metrics(args):
+        try:
+            with open(args["file_path"], 'r', encoding='utf-8') as f:
+                content = f.read()
             
-            try:
-                with open(args["file_path"], 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                language = args.get("language", os.path.splitext(args["file_path"])[1][1:])
-                analyzer = indexer.optimizer.analyzer
-                
-                analysis = analyzer.analyze_code(content, language)
-                
-                result = {
-                    "functions": analysis["functions"],
-                    "classes": analysis["classes"],
-                    "imports": analysis["imports"],
-                    "dependencies": analysis["dependencies"]
-                }
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps(result, indent=2, ensure_ascii=False)
-                    )
-                ]
-            except Exception as e:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"分析代码结构失败: {str(e)}"
-                    )
-                ]
-
-        elif name == "analyze_code_quality":
-            if "file_path" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少文件路径参数"
-                    )
-                ]
+            language = args.get("language", os.path.splitext(args["file_path"])[1][1:])
+            optimizer = indexer.optimizer
             
-            try:
-                with open(args["file_path"], 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                language = args.get("language", os.path.splitext(args["file_path"])[1][1:])
-                optimizer = indexer.optimizer
-                
-                quality_metrics = optimizer.analyze_code_quality(content, args["file_path"], language)
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps(quality_metrics, indent=2, ensure_ascii=False)
-                    )
-                ]
-            except Exception as e:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"分析代码质量失败: {str(e)}"
-                    )
-                ]
-
-        elif name == "find_similar_code":
-            if "code" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少代码片段参数"
-                    )
-                ]
+            metrics = optimizer.get_code_metrics(content, args["file_path"], language)
             
-            try:
-                code = args["code"]
-                language = args.get("language", "text")
-                limit = args.get("limit", 5)
-                
-                similar_code = search_engine.find_similar_code(code, language, limit)
-                
-                if not similar_code:
-                    return [
-                        TextContent(
-                            type="text",
-                            text="未找到相似代码。"
-                        )
-                    ]
-                
-                formatted_results = []
-                for i, result in enumerate(similar_code):
-                    file_path = result.get("file_path", "")
-                    similarity = result.get("similarity", 0)
-                    content = result.get("content", "")
-                    
-                    formatted_results.append(f"### {i+1}. 相似度: {similarity:.2%}")
-                    formatted_results.append(f"File: {file_path}")
-                    formatted_results.append(f"```{language}")
-                    formatted_results.append(content)
-                    formatted_results.append("```")
-                    formatted_results.append("")
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text="\n".join(formatted_results)
-                    )
-                ]
-            except Exception as e:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"查找相似代码失败: {str(e)}"
-                    )
-                ]
+            return _text(dumps_indented(metrics, ensure_ascii=False))
+        except Exception as e:
+            return _text(f"获取代码度量数据失败: {str(e)}")
 
-        elif name == "get_code_metrics":
-            if "file_path" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少文件路径参数"
-                    )
-                ]
+    def _analyze_dependencies(args):
+        try:
+            dependencies = indexer.optimizer.analyze_project_dependencies(args["project_path"])
             
-            try:
-                with open(args["file_path"], 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                language = args.get("language", os.path.splitext(args["file_path"])[1][1:])
-                optimizer = indexer.optimizer
-                
-                metrics = optimizer.get_code_metrics(content, args["file_path"], language)
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps(metrics, indent=2, ensure_ascii=False)
-                    )
-                ]
-            except Exception as e:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"获取代码度量数据失败: {str(e)}"
-                    )
-                ]
+            # Sets are serialized as lists by the encoder
+            return _text(dumps_indented(dependencies, ensure_ascii=False))
+        except Exception as e:
+            return _text(f"分析项目依赖关系失败: {str(e)}")
 
-        elif name == "analyze_dependencies":
-            if "project_path" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少项目路径参数"
-                    )
-                ]
+    # 多代理分析工具
+    def _multi_agent_analyze(args):
+        try:
+            analysis_results = agent_manager.analyze_code(args["file_path"])
             
-            try:
-                dependencies = indexer.optimizer.analyze_project_dependencies(args["project_path"])
-                
-                # Convert sets to lists for JSON serialization
-                serializable_dependencies = convert_sets_to_lists(dependencies)
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps(serializable_dependencies, indent=2, ensure_ascii=False)
-                    )
-                ]
-            except Exception as e:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"分析项目依赖关系失败: {str(e)}"
-                    )
-                ]
-        
-        # 多代理分析工具
-        elif name == "multi_agent_analyze" and agent_manager:
-            if "file_path" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少文件路径参数"
-                    )
-                ]
+            return _text(dumps_indented(analysis_results, ensure_ascii=False))
+        except Exception as e:
+            return _text(f"多代理分析失败: {str(e)}")
+
+    # 代理搜索工具
+    def _agent_search(args):
+        try:
+            search_results = agent_manager.search_code(args["query"])
             
-            try:
-                analysis_results = agent_manager.analyze_code(args["file_path"])
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps(analysis_results, indent=2, ensure_ascii=False)
-                    )
-                ]
-            except Exception as e:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"多代理分析失败: {str(e)}"
-                    )
-                ]
+            return _text(dumps_indented(search_results, ensure_ascii=False))
+        except Exception as e:
+            return _text(f"代理搜索失败: {str(e)}")
+
+    # 工具名称到处理函数的映射，在服务器创建时构建一次
+    tool_handlers = {
+        "identify_project": _identify_project,
+        "index_project": _index_project,
+        "search_code": _search_code,
+        "get_code_structure": _get_code_structure,
+        "analyze_code_quality": _analyze_code_quality,
+        "find_similar_code": _find_similar_code,
+        "get_code_metrics": _get_code_metrics,
+        "analyze_dependencies": _analyze_dependencies
+    }
+    
+    # 如果代理管理器可用，注册多代理工具
+    if agent_manager:
+        tool_handlers["multi_agent_analyze"] = _multi_agent_analyze
+        tool_handlers["agent_search"] = _agent_search
+    
+    # 各工具的必需参数取自其输入模式，分发前统一校验
+    required_args = {tool.name: tuple(tool.inputSchema.get("required", ())) for tool in tools}
+    
+    # 工具处理函数会阻塞（索引、分析、等待索引完成），在专用的有界线程池中执行，
+    # 不占用事件循环，也不挤占asyncio默认执行器
+    tool_pool = ThreadPoolExecutor(
+        max_workers=config.get("server.tool_workers", os.cpu_count() or 4),
+        thread_name_prefix="mcp-tool"
+    )
+    
+    # 系统关闭时释放工具线程池
+    def _shutdown_tool_pool(event):
+        tool_pool.shutdown(wait=False)
+    
+    subscribe(EventType.SYSTEM_SHUTDOWN, _shutdown_tool_pool)
+    
+    # 设置工具调用请求处理程序
+    @server.call_tool()
+    async def call_tool(name, args):
+        handler = tool_handlers.get(name)
+        if handler is None:
+            return _text(f"未知工具：{name}")
         
-        # 代理搜索工具
-        elif name == "agent_search" and agent_manager:
-            if "query" not in args:
-                return [
-                    TextContent(
-                        type="text",
-                        text="错误：缺少查询参数"
-                    )
-                ]
-            
-            try:
-                search_results = agent_manager.search_code(args["query"])
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps(search_results, indent=2, ensure_ascii=False)
-                    )
-                ]
-            except Exception as e:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"代理搜索失败: {str(e)}"
-                    )
-                ]
+        missing = [arg for arg in required_args[name] if arg not in args]
+        if missing:
+            return _text(f"错误：缺少参数 {', '.join(missing)}")
         
-        else:
-            return [
-                TextContent(
-                    type="text",
-                    text=f"未知工具：{name}"
-                )
-            ]
+        return await asyncio.get_running_loop().run_in_executor(tool_pool, handler, args)
     
     return server